@@ -0,0 +1,75 @@
+"""
+Binary cache format for S2P and S2PDataset
+
+    8 bytes  - magic b'RFS2PBIN'
+    8 bytes  - little-endian uint64 length of header
+    header   - utf-8 JSON: version, n_files, nop, dtype, suffix, format,
+               degree, z0, meta, freq_offset, data_offset
+    padding  - blocks are aligned to 64 bytes
+    freqs    - float64 (nop) in Hz
+    data     - complex64 / complex128 (n_files, nop, 2, 2)
+"""
+import json
+import struct
+
+import numpy as np
+
+MAGIC = b'RFS2PBIN'
+VERSION = 1
+_ALIGN = 64
+
+
+def _align(offset):
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def write_cached(path, freqs, matrix, info, dtype=complex):
+    """
+    Write freqs (nop) and matrix (n_files, nop, 2, 2) with info dict to path
+    """
+    dtype = np.dtype(dtype)
+    if dtype not in (np.dtype(np.complex64), np.dtype(np.complex128)):
+        raise ValueError('dtype must be one of complex64, complex128')
+    freqs = np.ascontiguousarray(freqs, dtype='<f8')
+    matrix = np.ascontiguousarray(matrix, dtype=dtype.newbyteorder('<'))
+    header = dict(info)
+    header.update({'version': VERSION, 'n_files': matrix.shape[0], 'nop': matrix.shape[1],
+                   'dtype': dtype.name, 'freq_offset': 0, 'data_offset': 0})
+    # room for digits of offsets, which are unknown before header length is known
+    text = json.dumps(header).encode('utf-8')
+    header['freq_offset'] = _align(16 + len(text) + 64)
+    header['data_offset'] = _align(header['freq_offset'] + freqs.nbytes)
+    text = json.dumps(header).encode('utf-8')
+    with open(path, 'wb') as fh:
+        fh.write(MAGIC)
+        fh.write(struct.pack('<Q', len(text)))
+        fh.write(text)
+        fh.write(b'\0' * (header['freq_offset'] - 16 - len(text)))
+        freqs.tofile(fh)
+        fh.write(b'\0' * (header['data_offset'] - header['freq_offset'] - freqs.nbytes))
+        matrix.tofile(fh)
+
+
+def read_header(path):
+    with open(path, 'rb') as fh:
+        if fh.read(8) != MAGIC:
+            raise ValueError('{} is not S2P binary cache'.format(path))
+        length, = struct.unpack('<Q', fh.read(8))
+        header = json.loads(fh.read(length).decode('utf-8'))
+    if header['version'] > VERSION:
+        raise ValueError('Unsupported cache version {}'.format(header['version']))
+    return header
+
+
+def open_cached(path):
+    """
+    Memory-map cache file, return (freqs, matrix, header)
+
+    Arrays are read-only np.memmap, nothing is read until data is accessed.
+    """
+    header = read_header(path)
+    nop = header['nop']
+    freqs = np.memmap(path, dtype='<f8', mode='r', offset=header['freq_offset'], shape=(nop,))
+    matrix = np.memmap(path, dtype=np.dtype(header['dtype']).newbyteorder('<'), mode='r',
+                       offset=header['data_offset'], shape=(header['n_files'], nop, 2, 2))
+    return freqs, matrix, header
@@ -0,0 +1,197 @@
+"""
+Batched conversions between network parameters
+
+All functions take arrays of shape (..., N, N), where the leading axes are
+frequencies (and optionally files), and process the whole stack at once.
+z0 is a scalar or per-port array of real reference impedances.
+H, G, T and ABCD are defined only for 2-ports.
+T is the scattering transfer matrix with [b1, a1] = T [a2, b2], the same
+as S2P.s2t, so a cascade of networks is a product of their T-matrices.
+"""
+import numpy as np
+
+PARAMETERS = ('S', 'Z', 'Y', 'H', 'G', 'T', 'ABCD')
+
+
+def _ports(matrix):
+    matrix = np.asarray(matrix)
+    if matrix.ndim < 2 or matrix.shape[-1] != matrix.shape[-2]:
+        raise ValueError('Matrix must have shape (..., N, N)')
+    return matrix.shape[-1]
+
+
+def _two_port(matrix):
+    if _ports(matrix) != 2:
+        raise ValueError('Parameter is defined only for 2-port networks')
+    return matrix[..., 0, 0], matrix[..., 0, 1], matrix[..., 1, 0], matrix[..., 1, 1]
+
+
+def _stack(m11, m12, m21, m22):
+    out = np.empty(np.shape(m11) + (2, 2), dtype=np.result_type(m11, m12, m21, m22))
+    out[..., 0, 0] = m11
+    out[..., 0, 1] = m12
+    out[..., 1, 0] = m21
+    out[..., 1, 1] = m22
+    return out
+
+
+def matmul2(a, b):
+    """
+    Product of stacks of 2 x 2 matrices written out elementwise,
+    it is several times faster than np.matmul for such small matrices
+    """
+    a11, a12, a21, a22 = _two_port(a)
+    b11, b12, b21, b22 = _two_port(b)
+    return _stack(a11 * b11 + a12 * b21, a11 * b12 + a12 * b22,
+                  a21 * b11 + a22 * b21, a21 * b12 + a22 * b22)
+
+
+def _sqrt_z0(z0, nports):
+    z0 = np.asarray(z0, dtype=float)
+    if z0.ndim == 0:
+        z0 = np.repeat(z0, nports)
+    if z0.shape != (nports,):
+        raise ValueError('Length Z must be equal to port number')
+    return np.sqrt(z0)
+
+
+def s2z(s, z0=50):
+    nports = _ports(s)
+    sq = _sqrt_z0(z0, nports)
+    eye = np.eye(nports)
+    z = np.linalg.solve(eye - s, eye + s)
+    return z * (sq[:, None] * sq[None, :])
+
+
+def z2s(z, z0=50):
+    nports = _ports(z)
+    sq = _sqrt_z0(z0, nports)
+    eye = np.eye(nports)
+    zn = z / (sq[:, None] * sq[None, :])
+    return np.linalg.solve(zn + eye, zn - eye)
+
+
+def s2y(s, z0=50):
+    nports = _ports(s)
+    sq = _sqrt_z0(z0, nports)
+    eye = np.eye(nports)
+    y = np.linalg.solve(eye + s, eye - s)
+    return y / (sq[:, None] * sq[None, :])
+
+
+def y2s(y, z0=50):
+    nports = _ports(y)
+    sq = _sqrt_z0(z0, nports)
+    eye = np.eye(nports)
+    yn = y * (sq[:, None] * sq[None, :])
+    return np.linalg.solve(eye + yn, eye - yn)
+
+
+def z2y(z):
+    return np.linalg.inv(z)
+
+
+def y2z(y):
+    return np.linalg.inv(y)
+
+
+def z2h(z):
+    z11, z12, z21, z22 = _two_port(z)
+    det = z11 * z22 - z12 * z21
+    return _stack(det / z22, z12 / z22, -z21 / z22, 1 / z22)
+
+
+def h2z(h):
+    h11, h12, h21, h22 = _two_port(h)
+    det = h11 * h22 - h12 * h21
+    return _stack(det / h22, h12 / h22, -h21 / h22, 1 / h22)
+
+
+def z2g(z):
+    z11, z12, z21, z22 = _two_port(z)
+    det = z11 * z22 - z12 * z21
+    return _stack(1 / z11, -z12 / z11, z21 / z11, det / z11)
+
+
+def g2z(g):
+    g11, g12, g21, g22 = _two_port(g)
+    det = g11 * g22 - g12 * g21
+    return _stack(1 / g11, -g12 / g11, g21 / g11, det / g11)
+
+
+def s2abcd(s, z0=50):
+    s11, s12, s21, s22 = _two_port(s)
+    z1, z2 = _sqrt_z0(z0, 2) ** 2
+    prod = s12 * s21
+    den = 2 * s21 * np.sqrt(z1 * z2)
+    return _stack(z1 * ((1 + s11) * (1 - s22) + prod) / den,
+                  z1 * z2 * ((1 + s11) * (1 + s22) - prod) / den,
+                  ((1 - s11) * (1 - s22) - prod) / den,
+                  z2 * ((1 - s11) * (1 + s22) + prod) / den)
+
+
+def abcd2s(abcd, z0=50):
+    a, b, c, d = _two_port(abcd)
+    z1, z2 = _sqrt_z0(z0, 2) ** 2
+    den = a * z2 + b + c * z1 * z2 + d * z1
+    root = 2 * np.sqrt(z1 * z2)
+    return _stack((a * z2 + b - c * z1 * z2 - d * z1) / den,
+                  root * (a * d - b * c) / den,
+                  root / den,
+                  (-a * z2 + b - c * z1 * z2 + d * z1) / den)
+
+
+def s2t(s):
+    s11, s12, s21, s22 = _two_port(s)
+    det = s11 * s22 - s12 * s21
+    return _stack(-det / s21, s11 / s21, -s22 / s21, 1 / s21)
+
+
+def t2s(t):
+    t11, t12, t21, t22 = _two_port(t)
+    det = t11 * t22 - t12 * t21
+    return _stack(t12 / t22, det / t22, 1 / t22, -t21 / t22)
+
+
+_TO_Z = {'Y': y2z, 'H': h2z, 'G': g2z}
+_FROM_Z = {'Y': z2y, 'H': z2h, 'G': z2g}
+
+
+def convert(matrix, src, dst, z0=50):
+    """
+    Convert (..., N, N) array of src parameters to dst parameters
+
+    T and ABCD are converted through S, so networks without Z-matrix
+    (like series element) are handled, S <-> Y are converted directly,
+    everything else goes through Z.
+    """
+    if src not in PARAMETERS or dst not in PARAMETERS:
+        raise ValueError('Parameter must be one of {S, Y, Z, H, G, T, ABCD}')
+    matrix = np.asarray(matrix)
+    if src == dst:
+        return matrix
+    if src == 'T':
+        return convert(t2s(matrix), 'S', dst, z0)
+    if dst == 'T':
+        return s2t(convert(matrix, src, 'S', z0))
+    if src == 'ABCD':
+        return convert(abcd2s(matrix, z0), 'S', dst, z0)
+    if dst == 'ABCD':
+        return s2abcd(convert(matrix, src, 'S', z0), z0)
+    if src == 'S' and dst == 'Y':
+        return s2y(matrix, z0)
+    if src == 'Y' and dst == 'S':
+        return y2s(matrix, z0)
+
+    if src == 'S':
+        z = s2z(matrix, z0)
+    elif src == 'Z':
+        z = matrix
+    else:
+        z = _TO_Z[src](matrix)
+
+    if dst == 'S':
+        return z2s(z, z0)
+    if dst == 'Z':
+        return z
+    return _FROM_Z[dst](z)
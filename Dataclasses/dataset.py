@@ -0,0 +1,332 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from Dataclasses.binary import open_cached, write_cached
+from Dataclasses.metrics import compute
+from Dataclasses.resample import get_plan
+from Dataclasses.s2p import S2P
+from Dataclasses.sweep.frequency import Frequency
+from Dataclasses.time_domain import gate, transform
+from Dataclasses.validation import check
+
+_EXTENSIONS = ('.s2p', '.csv')
+
+
+def _expand_paths(paths):
+    if isinstance(paths, (str, os.PathLike)):
+        paths = os.fspath(paths)
+        if os.path.isdir(paths):
+            paths = [os.path.join(paths, name) for name in os.listdir(paths)
+                     if name.lower().endswith(_EXTENSIONS)]
+        else:
+            paths = glob.glob(paths)
+        paths = sorted(paths)
+    return [str(path) for path in paths]
+
+
+def _load_file(args):
+    """
+    Worker for process pool: parse one file, return its arrays and metadata
+    """
+    path, freq_suffix, format = args
+    s2p = S2P()
+    if path.lower().endswith('.csv'):
+        import pandas as pd
+        s2p.from_dataframe(pd.read_csv(path), freq_suffix=freq_suffix, format=format)
+    else:
+        s2p.from_s2p(path)
+    meta = {'path': path, 'format': s2p.format, 'suffix': s2p._suffix, 'z0': s2p.z0}
+    return s2p._freq, s2p._matrix, meta
+
+
+def _check_file(args):
+    """
+    Worker for process pool: parse and check one file, return its report row
+    """
+    path, freq_suffix, format, passivity_tol, reciprocity_tol, causality_tol = args
+    freqs, matrix, meta = _load_file((path, freq_suffix, format))
+    return _report_row(path, check(matrix, freqs, passivity_tol=passivity_tol,
+                                    reciprocity_tol=reciprocity_tol,
+                                    causality_tol=causality_tol))
+
+
+def _report_row(path, result):
+    row = {'path': path,
+           'passive': not result['non_passive'].any(),
+           'passivity_margin': float(result['passivity_margin']),
+           'non_passive_points': int(result['non_passive'].sum()),
+           'reciprocal': not result['non_reciprocal'].any(),
+           'reciprocity_error': float(result['reciprocity_error']),
+           'non_reciprocal_points': int(result['non_reciprocal'].sum())}
+    if 'causality_error' in result:
+        row['causal'] = not bool(result['non_causal'])
+        row['causality_error'] = float(result['causality_error'])
+    return row
+
+
+class S2PDataset:
+    """
+    class for handle stack of S2P measurements on one frequency grid
+
+    Attributes:
+
+        _matrix - complex array (n_files, nop, 2, 2) of S-params, complex128 or complex64
+        _freq - float array of frequencies in Hz
+        _meta - list of dicts with metadata for every file
+        _suffix - frequency suffix
+        _format - one of the DB, MA, RI
+        _degree - True if angles in degrees
+        _z0 - reference impedance
+        _metrics - cache of derived metrics by name
+    """
+
+    def __init__(self, freqs, matrix, meta=None, freq_suffix='Hz', format='DB', degree=True, z0=50.,
+                 dtype=complex):
+        dtype = np.dtype(dtype)
+        if dtype not in (np.dtype(np.complex64), np.dtype(np.complex128)):
+            raise ValueError('dtype must be one of complex64, complex128')
+        freqs = S2P._own_freqs(freqs)
+        matrix = np.ascontiguousarray(matrix, dtype=dtype)
+        if matrix.ndim != 4 or matrix.shape[1:] != (len(freqs), 2, 2):
+            raise ValueError('Matrix must have shape (n_files, nop, 2, 2)')
+        if meta is None:
+            meta = [dict() for _ in range(matrix.shape[0])]
+        if len(meta) != matrix.shape[0]:
+            raise ValueError('Length of meta must be equal to number of files')
+        self._freq = freqs
+        self._matrix = matrix
+        self._meta = list(meta)
+        self._suffix = freq_suffix
+        self._format = format
+        self._degree = degree
+        self._z0 = z0
+        self._freq_obj = None
+        self._metrics = dict()
+
+    def __str__(self):
+        return 'S2PDataset Object, {} files x {} points'.format(*self._matrix.shape[:2])
+
+    def __len__(self):
+        return self._matrix.shape[0]
+
+    def __getitem__(self, item):
+        """
+        Return S2P of one file or new dataset for slice of files
+        """
+        if isinstance(item, slice):
+            return S2PDataset(self._freq, self._matrix[item], self._meta[item], freq_suffix=self._suffix,
+                              format=self._format, degree=self._degree, z0=self._z0, dtype=self.dtype)
+        if not isinstance(item, (int, np.integer)):
+            raise TypeError('Index must be int or slice')
+        s2p = S2P(format=self._format, degree=self._degree, dtype=self._matrix.dtype)
+        s2p._suffix = self._suffix
+        s2p._z0 = self._z0
+        s2p._set_data(self._freq, self._matrix[item])
+        return s2p
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def matrix_(self):
+        return self._matrix
+
+    @property
+    def dtype(self):
+        return self._matrix.dtype
+
+    @property
+    def nbytes(self):
+        return self._matrix.nbytes + self._freq.nbytes
+
+    @property
+    def meta(self):
+        return self._meta
+
+    @property
+    def freq(self):
+        if self._freq_obj is None or self._freq_obj.suffix != self._suffix:
+            self._freq_obj = Frequency(freqs=self._freq)
+            self._freq_obj.suffix = self._suffix
+        return self._freq_obj
+
+    @property
+    def z0(self):
+        return self._z0
+
+    def metrics(self, *names):
+        """
+        Return dict of derived metrics of all files, arrays have leading axis n_files
+
+        See Dataclasses.metrics.compute for names, results are cached.
+        """
+        missing = [name for name in names if name not in self._metrics]
+        if missing:
+            for name, value in compute(self._freq, self._matrix, missing).items():
+                value.flags.writeable = False
+                self._metrics[name] = value
+        return {name: self._metrics[name] for name in names}
+
+    def metric(self, name):
+        return self.metrics(name)[name]
+
+    def check(self, passivity_tol=1e-6, reciprocity_tol=1e-6, causality_tol=None, chunk_size=256):
+        """
+        Return dict of violation masks (n_files, nop) and worst values (n_files)
+
+        See Dataclasses.validation.check.
+        """
+        return check(self._matrix, self._freq, passivity_tol=passivity_tol,
+                     reciprocity_tol=reciprocity_tol, causality_tol=causality_tol,
+                     chunk_size=chunk_size)
+
+    def report(self, passivity_tol=1e-6, reciprocity_tol=1e-6, causality_tol=None):
+        """
+        Return DataFrame with one row of check results per file
+        """
+        import pandas as pd
+        result = self.check(passivity_tol, reciprocity_tol, causality_tol)
+        rows = []
+        for i, meta in enumerate(self._meta):
+            rows.append(_report_row(meta.get('path', i),
+                                    {name: value[i] for name, value in result.items()}))
+        return pd.DataFrame(rows)
+
+    @staticmethod
+    def check_files(paths, freq_suffix='Hz', format='DB', passivity_tol=1e-6, reciprocity_tol=1e-6,
+                    causality_tol=None, processes=None, chunksize=4):
+        """
+        Check lot of files in a process pool without stacking them, return
+        DataFrame with one row per file
+
+        Files may have different frequency grids. Workers return only
+        report rows, so memory doesn't grow with the lot.
+        """
+        import pandas as pd
+        paths = _expand_paths(paths)
+        if not paths:
+            raise ValueError('No files to check')
+        args = [(path, freq_suffix, format, passivity_tol, reciprocity_tol, causality_tol)
+                for path in paths]
+        if processes == 1:
+            return pd.DataFrame(list(map(_check_file, args)))
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            return pd.DataFrame(list(pool.map(_check_file, args, chunksize=chunksize)))
+
+    def render(self, out_dir, **settings):
+        """
+        Draw every file into out_dir by one Renderer, return image paths
+
+        settings are arguments of Dataclasses.plotting.Renderer.
+        """
+        from Dataclasses.plotting import Renderer
+        names = [os.path.splitext(os.path.basename(meta['path']))[0] if 'path' in meta
+                 else '{:05d}'.format(i) for i, meta in enumerate(self._meta)]
+        return Renderer(**settings).render_many(self, out_dir, names)
+
+    def time_domain(self, mode='bandpass', window='kaiser', beta=6., n_time=None,
+                    t_start=None, t_stop=None, step=False):
+        """
+        Return (times, response) of all files, response has shape (n_files, n_time, 2, 2)
+        """
+        times, resp = transform(self._freq, np.moveaxis(self._matrix, 1, -1), mode=mode,
+                                window=window, beta=beta, n_time=n_time,
+                                t_start=t_start, t_stop=t_stop, step=step)
+        return times, np.moveaxis(resp, -1, 1)
+
+    def gated(self, t_start, t_stop, window='kaiser', beta=6.):
+        """
+        Return new dataset with responses outside of [t_start, t_stop] seconds removed
+        """
+        data = gate(self._freq, np.moveaxis(self._matrix, 1, -1), t_start, t_stop,
+                    window=window, beta=beta)
+        return S2PDataset(self._freq, np.moveaxis(data, -1, 1), self._meta, freq_suffix=self._suffix,
+                          format=self._format, degree=self._degree, z0=self._z0, dtype=self.dtype)
+
+    def save_cached(self, path, dtype=None):
+        """
+        Write dataset to one binary cache file, dtype is complex64 or complex128,
+        storage dtype by default
+        """
+        info = {'suffix': self._suffix, 'format': self._format, 'degree': self._degree,
+                'z0': self._z0, 'meta': self._meta}
+        write_cached(path, self._freq, self._matrix, info, dtype=dtype or self.dtype)
+
+    @classmethod
+    def load_cached(cls, path):
+        """
+        Return dataset memory-mapped from binary cache file as a single mmap
+        """
+        freqs, matrix, header = open_cached(path)
+        return cls(freqs, matrix, header['meta'], freq_suffix=header['suffix'],
+                   format=header['format'], degree=header['degree'], z0=header['z0'],
+                   dtype=header['dtype'])
+
+    @classmethod
+    def from_s2ps(cls, s2ps, meta=None):
+        """
+        Stack list of S2P objects with the same frequency grid
+        """
+        s2ps = list(s2ps)
+        if not s2ps:
+            raise ValueError('At least one S2P must be given')
+        first = s2ps[0]
+        for s2p in s2ps[1:]:
+            first._check_grid(s2p)
+        return cls(first._freq, np.stack([s2p._matrix for s2p in s2ps]), meta,
+                   freq_suffix=first._suffix, format=first.format, degree=first.degree, z0=first.z0,
+                   dtype=first.dtype)
+
+    @classmethod
+    def from_files(cls, paths, freq_suffix='Hz', format='DB', processes=None, resample=False,
+                   mode='ri', chunksize=4, dtype=complex):
+        """
+        Load directory, glob pattern or list of .s2p / .csv files
+
+        Files are parsed in a process pool of processes workers (all cores
+        by default, 1 - in the current process) and written into one
+        preallocated array. freq_suffix and format are used for csv files.
+        All files must have the same z0, format of every file is kept in meta
+        and the dataset takes format of the first file.
+        If frequency grid of a file differs from the first file, the file is
+        resampled when resample is True, else ValueError is raised.
+        dtype is storage dtype of the stacked array.
+        """
+        paths = _expand_paths(paths)
+        if not paths:
+            raise ValueError('No files to load')
+        args = [(path, freq_suffix, format) for path in paths]
+        if processes == 1:
+            results = map(_load_file, args)
+            return cls._collect(results, len(paths), resample, mode, dtype)
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = pool.map(_load_file, args, chunksize=chunksize)
+            return cls._collect(results, len(paths), resample, mode, dtype)
+
+    @classmethod
+    def _collect(cls, results, n_files, resample, mode, dtype):
+        freqs = None
+        matrix = None
+        meta = []
+        for i, (file_freqs, file_matrix, file_meta) in enumerate(results):
+            if matrix is None:
+                freqs = file_freqs
+                matrix = np.empty((n_files,) + file_matrix.shape, dtype=dtype)
+                first = file_meta
+            if file_meta['z0'] != first['z0']:
+                raise ValueError('z0 of {} differs from {}'.format(file_meta['path'], first['path']))
+            file_meta['resampled'] = False
+            if not np.array_equal(file_freqs, freqs):
+                if not resample:
+                    raise ValueError('Frequency grid of {} differs from {}'.format(file_meta['path'],
+                                                                                  first['path']))
+                file_matrix = get_plan(file_freqs, freqs)(file_matrix, mode=mode)
+                file_meta['resampled'] = True
+            matrix[i] = file_matrix
+            meta.append(file_meta)
+        return cls(freqs, matrix, meta, freq_suffix=first['suffix'], format=first['format'],
+                   z0=first['z0'], dtype=dtype)
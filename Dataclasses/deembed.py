@@ -0,0 +1,87 @@
+import numpy as np
+
+from Dataclasses.conversions import matmul2, s2t, t2s
+from Dataclasses.s2p import S2P
+
+
+class Deembedding:
+    """
+    class for removing test fixtures from DUT measurements
+
+    T-matrices of fixtures are inverted once at creation and reused for
+    every DUT: T_dut = inv(T_left) * T_measured * inv(T_right)
+
+    Attributes:
+
+        _freq - frequencies of fixtures in Hz
+        _z0 - reference impedance of fixtures
+        _left_inv - inverse T-matrix (nop, 2, 2) of left fixture or None
+        _right_inv - inverse T-matrix (nop, 2, 2) of right fixture or None
+    """
+
+    def __init__(self, left=None, right=None):
+        if left is None and right is None:
+            raise ValueError('At least one fixture must be given')
+        fixtures = [x for x in (left, right) if x is not None]
+        for fixture in fixtures[1:]:
+            fixtures[0]._check_grid(fixture)
+        self._freq = fixtures[0]._freq
+        self._z0 = fixtures[0].z0
+        self._left_inv = self._inverse(left)
+        self._right_inv = self._inverse(right)
+
+    def __str__(self):
+        return 'Deembedding Object'
+
+    @staticmethod
+    def _inverse(fixture):
+        if fixture is None:
+            return None
+        if not isinstance(fixture, S2P):
+            raise TypeError('Fixture must be S2P class')
+        return np.linalg.inv(s2t(fixture._matrix.astype(complex)))
+
+    def _check(self, dut):
+        if not isinstance(dut, S2P):
+            raise TypeError('DUT must be S2P class')
+        if not np.array_equal(dut._freq, self._freq):
+            raise ValueError('DUT and fixtures must have the same frequency grid')
+        if dut.z0 != self._z0:
+            raise ValueError('DUT and fixtures must have the same Z0')
+
+    def _remove(self, t):
+        if self._left_inv is not None:
+            t = matmul2(self._left_inv, t)
+        if self._right_inv is not None:
+            t = matmul2(t, self._right_inv)
+        return t
+
+    def apply(self, dut):
+        """
+        Return new S2P of DUT without fixtures
+        """
+        self._check(dut)
+        return dut._new(dut._freq, t2s(self._remove(s2t(dut._matrix))))
+
+    def apply_many(self, duts, batch_size=256):
+        """
+        Generator of de-embedded S2P for iterable of DUTs
+
+        DUTs are stacked by batch_size and processed with one batched
+        product per fixture, so inverse fixtures are shared by the whole lot.
+        """
+        batch = []
+        for dut in duts:
+            self._check(dut)
+            batch.append(dut)
+            if len(batch) == batch_size:
+                yield from self._apply_batch(batch)
+                batch = []
+        if batch:
+            yield from self._apply_batch(batch)
+
+    def _apply_batch(self, batch):
+        t = s2t(np.stack([dut._matrix for dut in batch]))
+        s = t2s(self._remove(t))
+        for i, dut in enumerate(batch):
+            yield dut._new(dut._freq, s[i])
@@ -0,0 +1,244 @@
+"""
+Lazy arithmetic on S2P objects
+
+Operators on S2P (a - b, a / b, abs(a), 2 * a, mean([a, b, c])) build an
+expression graph instead of arrays. The graph is evaluated only for
+requested S-params and frequency range, chunk by chunk: every node
+computes one chunk of rows at a time, so intermediate arrays have chunk
+size and the data is read in one pass.
+"""
+import abc
+
+import numpy as np
+
+from Dataclasses.s2p import S2P
+
+
+def as_expression(value):
+    if isinstance(value, Expression):
+        return value
+    if isinstance(value, S2P):
+        return _Leaf(value)
+    if np.isscalar(value):
+        return _Const(value)
+    raise TypeError('Operand must be S2P, expression or number')
+
+
+def mean(items):
+    """
+    Lazy mean of S2P objects or expressions
+    """
+    items = [as_expression(x) for x in items]
+    if not items:
+        raise ValueError('At least one item must be given')
+    return _Mean(items)
+
+
+class Expression(abc.ABC):
+    """
+    class for lazy expression of S2P objects on one frequency grid
+
+    Attributes:
+
+        _template - first S2P of expression, holds grid, format and z0 of
+                    result, None for constant
+    """
+    __array_ufunc__ = None
+
+    _template = None
+
+    @abc.abstractmethod
+    def _chunk(self, rows, index):
+        """
+        Value of expression for rows of S-param at index (i, j)
+        """
+
+    @staticmethod
+    def _merge(nodes):
+        template = None
+        for node in nodes:
+            if node._template is None:
+                continue
+            if template is None:
+                template = node._template
+            elif node._template is not template:
+                template._check_grid(node._template)
+        return template
+
+    def __add__(self, other):
+        return _Binary(np.add, self, as_expression(other))
+
+    def __radd__(self, other):
+        return _Binary(np.add, as_expression(other), self)
+
+    def __sub__(self, other):
+        return _Binary(np.subtract, self, as_expression(other))
+
+    def __rsub__(self, other):
+        return _Binary(np.subtract, as_expression(other), self)
+
+    def __mul__(self, other):
+        return _Binary(np.multiply, self, as_expression(other))
+
+    def __rmul__(self, other):
+        return _Binary(np.multiply, as_expression(other), self)
+
+    def __truediv__(self, other):
+        return _Binary(np.true_divide, self, as_expression(other))
+
+    def __rtruediv__(self, other):
+        return _Binary(np.true_divide, as_expression(other), self)
+
+    def __neg__(self):
+        return _Unary(np.negative, self)
+
+    def __abs__(self):
+        return _Unary(np.abs, self)
+
+    def db(self):
+        """
+        20 * log10(|x|)
+        """
+        return _Unary(_db, self)
+
+    def phase(self, degree=True):
+        return _Unary(np.angle, self, deg=degree)
+
+    def real(self):
+        return _Unary(np.real, self)
+
+    def imag(self):
+        return _Unary(np.imag, self)
+
+    def conj(self):
+        return _Unary(np.conj, self)
+
+    def _rows(self, freqs):
+        nop = len(self._template._freq)
+        if freqs is None:
+            return range(nop)
+        if isinstance(freqs, slice):
+            rows = range(nop)[freqs]
+            if rows.step < 0:
+                raise ValueError('Frequency slice must have positive step')
+            return rows
+        start, stop = freqs
+        freq = self._template._freq
+        return range(int(np.searchsorted(freq, start, side='left')),
+                     int(np.searchsorted(freq, stop, side='right')))
+
+    def evaluate(self, params=None, freqs=None, chunk_size=65536):
+        """
+        Return dict of arrays for requested S-params
+
+        params - list of S11, S12, S21, S22, all by default
+        freqs - slice of frequency indexes or (start, stop) in Hz, all by default
+        chunk_size - rows evaluated at once
+        """
+        if self._template is None:
+            raise ValueError('Expression must contain at least one S2P')
+        if params is None:
+            params = S2P._NAMES[1:]
+        elif isinstance(params, str):
+            params = [params]
+        rows = self._rows(freqs)
+        ans = dict()
+        for param in params:
+            if param not in S2P._INDEX:
+                raise KeyError('Parameter must be one of S11, S12, S21, S22')
+            index = S2P._INDEX[param]
+            out = None
+            for pos in range(0, len(rows), chunk_size):
+                part = rows[pos:pos + chunk_size]
+                value = self._chunk(slice(part.start, part.stop, part.step), index)
+                if out is None:
+                    out = np.empty(len(rows), dtype=np.result_type(value))
+                out[pos:pos + len(part)] = value
+            if out is None:
+                out = np.empty(0)
+            ans[param] = out
+        return ans
+
+    def __getitem__(self, param):
+        return self.evaluate([param])[param]
+
+    def freqs(self, freqs=None):
+        """
+        Frequencies in Hz of evaluated rows
+        """
+        rows = self._rows(freqs)
+        return self._template._freq[rows.start:rows.stop:rows.step]
+
+    def to_s2p(self, freqs=None, chunk_size=65536):
+        """
+        Evaluate all S-params into new S2P with format and z0 of first S2P
+        """
+        values = self.evaluate(freqs=freqs, chunk_size=chunk_size)
+        freq = self.freqs(freqs)
+        matrix = np.empty((len(freq), 2, 2), dtype=self._template.dtype)
+        for param, value in values.items():
+            matrix[(slice(None),) + S2P._INDEX[param]] = value
+        return self._template._new(freq, matrix)
+
+
+def _db(data):
+    with np.errstate(divide='ignore'):
+        return 20 * np.log10(np.abs(data))
+
+
+class _Leaf(Expression):
+
+    def __init__(self, s2p):
+        if not isinstance(s2p._matrix, np.ndarray):
+            raise TypeError('S2P must hold S-matrix array')
+        self._s2p = s2p
+        self._template = s2p
+
+    def _chunk(self, rows, index):
+        return self._s2p._matrix[rows, index[0], index[1]]
+
+
+class _Const(Expression):
+
+    def __init__(self, value):
+        self._value = value
+
+    def _chunk(self, rows, index):
+        return self._value
+
+
+class _Unary(Expression):
+
+    def __init__(self, func, operand, **kwargs):
+        self._func = func
+        self._operand = operand
+        self._kwargs = kwargs
+        self._template = operand._template
+
+    def _chunk(self, rows, index):
+        return self._func(self._operand._chunk(rows, index), **self._kwargs)
+
+
+class _Binary(Expression):
+
+    def __init__(self, func, left, right):
+        self._func = func
+        self._left = left
+        self._right = right
+        self._template = self._merge((left, right))
+
+    def _chunk(self, rows, index):
+        return self._func(self._left._chunk(rows, index), self._right._chunk(rows, index))
+
+
+class _Mean(Expression):
+
+    def __init__(self, operands):
+        self._operands = operands
+        self._template = self._merge(operands)
+
+    def _chunk(self, rows, index):
+        total = self._operands[0]._chunk(rows, index)
+        for operand in self._operands[1:]:
+            total = total + operand._chunk(rows, index)
+        return total / len(self._operands)
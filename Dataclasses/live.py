@@ -0,0 +1,279 @@
+"""
+Live acquisition of sweeps with asyncio
+
+Source of sweeps (instrument or SimulatedVNA) is read by a producer task,
+sweeps wait in a bounded queue and are appended by a consumer task into
+SweepBuffer, a preallocated ring of (depth, nop, 2, 2) S-matrices with
+incrementally updated average and max-hold.
+"""
+import asyncio
+import os
+from collections import Counter, deque
+
+import numpy as np
+
+from Dataclasses.s2p import S2P
+
+_EXAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 's2p_example.csv')
+
+
+class SweepBuffer:
+    """
+    class for ring buffer of last sweeps on one frequency grid
+
+    Attributes:
+
+        _ring - complex array (depth, nop, 2, 2) of last sweeps
+        _head - index of the next sweep in ring
+        _size - number of filled sweeps, at most depth
+        _count - number of sweeps appended since reset
+        _sum - sum of sweeps in ring, for average over ring
+        _max_mag - largest |S| since reset
+        _max_hold - S value at largest |S| since reset
+        _template - S2P that holds grid, format and z0 of returned S2P
+    """
+
+    def __init__(self, template, depth=64):
+        if not isinstance(template, S2P):
+            raise TypeError('Template must be S2P class')
+        if depth < 1:
+            raise ValueError('Depth must be one or greater')
+        self._template = template
+        nop = len(template._freq)
+        self._ring = np.zeros((depth, nop, 2, 2), dtype=complex)
+        self._sum = np.zeros((nop, 2, 2), dtype=complex)
+        self._max_mag = np.zeros((nop, 2, 2))
+        self._max_hold = np.zeros((nop, 2, 2), dtype=complex)
+        self._head = 0
+        self._size = 0
+        self._count = 0
+
+    def __str__(self):
+        return 'SweepBuffer Object, {} of {} sweeps'.format(self._size, self.depth)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def depth(self):
+        return self._ring.shape[0]
+
+    @property
+    def count(self):
+        return self._count
+
+    def reset(self):
+        self._sum[...] = 0
+        self._max_mag[...] = 0
+        self._max_hold[...] = 0
+        self._head = 0
+        self._size = 0
+        self._count = 0
+
+    def append(self, matrix):
+        """
+        Add sweep (nop, 2, 2), oldest sweep is overwritten when ring is full
+
+        Average and max-hold are updated by this sweep only, the sum is
+        recomputed from the ring once per turn to keep rounding errors
+        from growing.
+        """
+        matrix = np.asarray(matrix)
+        if matrix.shape != self._sum.shape:
+            raise ValueError('Sweep must have shape {}'.format(self._sum.shape))
+        slot = self._ring[self._head]
+        if self._size == self.depth:
+            self._sum -= slot
+        slot[...] = matrix
+        self._sum += slot
+        mag = np.abs(slot)
+        better = mag > self._max_mag
+        np.copyto(self._max_mag, mag, where=better)
+        np.copyto(self._max_hold, slot, where=better)
+        self._head = (self._head + 1) % self.depth
+        self._size = min(self._size + 1, self.depth)
+        self._count += 1
+        if self._head == 0:
+            np.sum(self._ring, axis=0, out=self._sum)
+
+    @property
+    def latest(self):
+        if self._size == 0:
+            raise ValueError('Buffer is empty')
+        return self._ring[self._head - 1]
+
+    @property
+    def average(self):
+        if self._size == 0:
+            raise ValueError('Buffer is empty')
+        return self._sum / self._size
+
+    @property
+    def max_hold(self):
+        return self._max_hold
+
+    def sweeps(self):
+        """
+        Return copy (size, nop, 2, 2) of sweeps in ring from oldest to newest
+        """
+        if self._size < self.depth:
+            return self._ring[:self._size].copy()
+        return np.roll(self._ring, -self._head, axis=0)
+
+    def to_s2p(self, kind='latest'):
+        """
+        Return S2P of 'latest', 'average' or 'max_hold' sweep
+        """
+        if kind not in {'latest', 'average', 'max_hold'}:
+            raise ValueError("Kind must be one of {'latest', 'average', 'max_hold'}")
+        matrix = getattr(self, kind)
+        if kind != 'average':
+            # latest and max_hold are views of live arrays
+            matrix = matrix.copy()
+        return self._template._new(self._template._freq, matrix)
+
+
+class SimulatedVNA:
+    """
+    class for local source of sweeps, measured S2P with added noise
+
+    Attributes:
+
+        _s2p - S2P that is "measured", s2p_example.csv by default
+        _rate - sweeps per second, None for no delay
+        _noise - rms of complex gaussian noise added to every S-param
+        _rng - random generator
+    """
+
+    def __init__(self, s2p=None, rate=10., noise=1e-3, seed=None):
+        if s2p is None:
+            import pandas as pd
+            s2p = S2P()
+            s2p.from_dataframe(pd.read_csv(_EXAMPLE), freq_suffix='GHz')
+        if not isinstance(s2p, S2P):
+            raise TypeError('Source must be S2P class')
+        self._s2p = s2p
+        self._rate = rate
+        self._noise = noise
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def s2p(self):
+        return self._s2p
+
+    def sweep(self):
+        matrix = self._s2p._matrix
+        noise = self._rng.standard_normal(matrix.shape + (2,)) * (self._noise / np.sqrt(2))
+        return matrix + noise[..., 0] + 1j * noise[..., 1]
+
+    async def sweeps(self, count=None):
+        """
+        Yield count sweeps (endless if None) at configured rate
+        """
+        n = 0
+        while count is None or n < count:
+            if self._rate:
+                await asyncio.sleep(1. / self._rate)
+            yield self.sweep()
+            n += 1
+
+
+class Acquisition:
+    """
+    class for asyncio pipeline from source of sweeps to SweepBuffer
+
+    Producer reads source into queue of at most queue_size pending sweeps,
+    consumer appends them to buffer and calls subscribers. When consumer
+    lags and queue is full, policy 'drop' drops the oldest pending sweep,
+    policy 'aggregate' averages new sweep into the newest pending one.
+
+    Attributes:
+
+        _buffer - SweepBuffer
+        _queue - deque of pending [sum of sweeps, number of sweeps]
+        _queue_size - maximum number of pending sweeps
+        _policy - 'drop' or 'aggregate'
+        _subscribers - callbacks called with buffer after every append,
+                       coroutine functions are awaited
+        _counters - received, dropped, aggregated and appended sweeps
+    """
+
+    def __init__(self, buffer, queue_size=4, policy='drop'):
+        if not isinstance(buffer, SweepBuffer):
+            raise TypeError('Buffer must be SweepBuffer class')
+        if policy not in {'drop', 'aggregate'}:
+            raise ValueError("Policy must be one of {'drop', 'aggregate'}")
+        if queue_size < 1:
+            raise ValueError('Queue size must be one or greater')
+        self._buffer = buffer
+        self._queue = deque()
+        self._queue_size = queue_size
+        self._policy = policy
+        self._subscribers = []
+        self._counters = Counter()
+        self._ready = None
+        self._done = False
+
+    @property
+    def buffer(self):
+        return self._buffer
+
+    @property
+    def counters(self):
+        return dict(self._counters)
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def put(self, matrix):
+        """
+        Add sweep to queue, applying backpressure policy if queue is full
+        """
+        self._counters['received'] += 1
+        if len(self._queue) >= self._queue_size:
+            if self._policy == 'drop':
+                self._queue.popleft()
+                self._counters['dropped'] += 1
+            else:
+                pending = self._queue[-1]
+                pending[0] += matrix
+                pending[1] += 1
+                self._counters['aggregated'] += 1
+                return
+        self._queue.append([np.array(matrix, dtype=complex), 1])
+        if self._ready is not None:
+            self._ready.set()
+
+    async def _produce(self, sweeps):
+        try:
+            async for matrix in sweeps:
+                self.put(matrix)
+                await asyncio.sleep(0)
+        finally:
+            self._done = True
+            self._ready.set()
+
+    async def _consume(self):
+        while True:
+            if not self._queue:
+                if self._done:
+                    return
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+            total, n = self._queue.popleft()
+            self._buffer.append(total / n if n > 1 else total)
+            self._counters['appended'] += 1
+            for callback in self._subscribers:
+                result = callback(self._buffer)
+                if asyncio.iscoroutine(result):
+                    await result
+
+    async def run(self, sweeps):
+        """
+        Run pipeline until async iterable of sweeps is exhausted
+        """
+        self._ready = asyncio.Event()
+        self._done = False
+        await asyncio.gather(self._produce(sweeps), self._consume())
+        return self._buffer
@@ -0,0 +1,127 @@
+"""
+Derived RF metrics of 2-port S-matrices
+
+Functions take complex arrays (..., nop, 2, 2), leading axes are files
+of a dataset, and compute metrics for all frequencies and files at once.
+Gains and losses are in dB, group delay in seconds. Metrics are computed
+in complex128 for any storage dtype, stability factors cancel large terms.
+"""
+import numpy as np
+
+METRICS = ('k', 'mu', 'mu_prime', 'delta', 'msg', 'mag', 'max_gain',
+           'group_delay', 'return_loss', 'vswr')
+
+
+class _Terms:
+    """
+    Intermediate values shared by metrics, computed once per call
+    """
+
+    def __init__(self, matrix):
+        self.s11 = matrix[..., 0, 0]
+        self.s12 = matrix[..., 0, 1]
+        self.s21 = matrix[..., 1, 0]
+        self.s22 = matrix[..., 1, 1]
+        self._cache = dict()
+
+    def get(self, name, func):
+        if name not in self._cache:
+            self._cache[name] = func()
+        return self._cache[name]
+
+    @property
+    def det(self):
+        return self.get('det', lambda: self.s11 * self.s22 - self.s12 * self.s21)
+
+    @property
+    def loop(self):
+        return self.get('loop', lambda: np.abs(self.s12 * self.s21))
+
+    @property
+    def abs11(self):
+        return self.get('abs11', lambda: np.abs(self.s11))
+
+    @property
+    def abs22(self):
+        return self.get('abs22', lambda: np.abs(self.s22))
+
+
+def _k(t):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (1 - t.abs11 ** 2 - t.abs22 ** 2 + np.abs(t.det) ** 2) / (2 * t.loop)
+
+
+def _mu(t):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (1 - t.abs11 ** 2) / (np.abs(t.s22 - t.det * np.conj(t.s11)) + t.loop)
+
+
+def _mu_prime(t):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (1 - t.abs22 ** 2) / (np.abs(t.s11 - t.det * np.conj(t.s22)) + t.loop)
+
+
+def _msg(t):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 10 * np.log10(np.abs(t.s21) / np.abs(t.s12))
+
+
+def _mag(t):
+    k = t.get('k', lambda: _k(t))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factor = np.where(k >= 1, k - np.sqrt(np.maximum(k * k - 1, 0)), np.nan)
+        return t.get('msg', lambda: _msg(t)) + 10 * np.log10(factor)
+
+
+def _max_gain(t):
+    mag = t.get('mag', lambda: _mag(t))
+    return np.where(np.isnan(mag), t.get('msg', lambda: _msg(t)), mag)
+
+
+def _ports(t):
+    return np.stack((t.abs11, t.abs22), axis=-1)
+
+
+def _return_loss(t):
+    with np.errstate(divide='ignore'):
+        return -20 * np.log10(_ports(t))
+
+
+def _vswr(t):
+    gamma = _ports(t)
+    with np.errstate(divide='ignore'):
+        return (1 + gamma) / (1 - gamma)
+
+
+_FUNCS = {'k': _k, 'mu': _mu, 'mu_prime': _mu_prime, 'delta': lambda t: np.abs(t.det),
+          'msg': _msg, 'mag': _mag, 'max_gain': _max_gain,
+          'return_loss': _return_loss, 'vswr': _vswr}
+
+
+def group_delay(freqs, matrix):
+    """
+    Group delay (..., nop, 2, 2) of all S-params: -d(phase)/d(omega)
+    """
+    phase = np.unwrap(np.angle(matrix), axis=-3)
+    return -np.gradient(phase, 2 * np.pi * np.asarray(freqs, dtype=float), axis=-3)
+
+
+def compute(freqs, matrix, names):
+    """
+    Return dict of metrics for S-matrix (..., nop, 2, 2)
+
+    names - iterable of METRICS: k, mu, mu_prime (stability), delta (|det S|),
+            msg, mag, max_gain (MAG where K >= 1 else MSG), group_delay,
+            return_loss and vswr (last axis is port 1, port 2)
+    """
+    matrix = np.asarray(matrix, dtype=complex)
+    terms = _Terms(matrix)
+    ans = dict()
+    for name in names:
+        if name == 'group_delay':
+            ans[name] = group_delay(freqs, matrix)
+        elif name in _FUNCS:
+            ans[name] = terms.get(name, lambda: _FUNCS[name](terms))
+        else:
+            raise ValueError('Metric must be one of {}'.format(', '.join(METRICS)))
+    return ans
@@ -0,0 +1,234 @@
+"""
+Plotting of S2P objects
+
+Matplotlib and seaborn are imported only with this module, S2P.plot and
+S2P.plot2 load it on first call. Renderer draws headless PNG/SVG files
+of long sweeps decimated to the pixel width of axes.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib.pyplot as plt
+import numpy as np
+import seaborn as sns
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from Dataclasses.dataset import _expand_paths, _load_file
+from Dataclasses.s2p import S2P
+
+
+def plot(s2p, params, **kwargs):
+    sns.set_theme()
+    if isinstance(params, str):
+        params = params.split(', ')
+    plot_num = len(params)
+    if plot_num > 1:
+        nrow = (plot_num + 1) // 2
+        ncol = 2 if plot_num > 1 else 1
+        fig, axs = plt.subplots(nrow, ncol)
+        for i in range(plot_num):
+            cur_row = (i - 1) // 2
+            cur_col = 1 if i > 1 else 0
+
+            param = params[i]
+            data = s2p._return_Sparam(s2p._sparam(param))
+            freq = s2p.freq.freqs
+            first = True
+            for key in data:
+                if first:
+                    axs[cur_row, cur_col].plot(freq, data[key])
+                    axs[cur_row, cur_col].set_title(param)
+                    first = False
+                else:
+                    ax2 = axs[cur_row, cur_col].twinx()
+                    ax2.plot(freq, data[key], color='orange')
+    else:
+        fig, ax = plt.subplots((plot_num + 1) // 2, 2 if plot_num > 1 else 1)
+        data = s2p._return_Sparam(s2p._sparam(params[0]))
+        freq = s2p.freq.freqs
+        first = True
+        for key in data:
+            if first:
+                ax.plot(freq, data[key])
+                first = False
+            else:
+                ax2 = ax.twinx()
+                ax2.plot(freq, data[key])
+            ax.set_title(params[0])
+    plt.show()
+
+
+def plot2(s2p, s_params, interpol=False, model=None):
+    sns.set_theme()
+    data = s2p._plot2_data(s_params, interpol, model)
+    fig, axs = plt.subplots(len(data), 1, squeeze=False)
+    for ax, (s_param, x, y, x_full, y_full) in zip(axs[:, 0], data):
+        sns.lineplot(x=x_full, y=y_full, ax=ax)
+        sns.scatterplot(x=x, y=y, ax=ax)
+        ax.set_title(s_param)
+    plt.show()
+
+
+def decimate(x, y, width, method='minmax'):
+    """
+    Return (x, y) reduced to about 2 * width points for axes of width pixels
+
+    method - 'minmax' keeps minimum and maximum of every pixel bucket in
+             their original order, so peaks and noise band look the same,
+             'lttb' keeps one point per bucket by largest triangle three
+             buckets
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(y)
+    width = int(width)
+    if method == 'minmax':
+        if n <= 2 * width:
+            return x, y
+        size = -(-n // width)
+        padded = np.concatenate((y, np.repeat(y[-1:], width * size - n))).reshape(width, size)
+        base = np.arange(width)[:, None] * size
+        index = np.sort(np.concatenate((base + np.argmin(padded, axis=1)[:, None],
+                                        base + np.argmax(padded, axis=1)[:, None]), axis=1), axis=1)
+        index = np.minimum(index.reshape(-1), n - 1)
+        return x[index], y[index]
+    elif method == 'lttb':
+        if n <= width or width < 3:
+            return x, y
+        edges = np.linspace(1, n - 1, width - 1).astype(np.intp)
+        index = np.empty(width, dtype=np.intp)
+        index[0] = 0
+        index[-1] = n - 1
+        for i in range(width - 2):
+            start, stop = edges[i], edges[i + 1]
+            nxt = slice(edges[i + 1], edges[i + 2] if i + 2 < width - 1 else n)
+            mean_x = np.mean(x[nxt])
+            mean_y = np.mean(y[nxt])
+            prev_x = x[index[i]]
+            prev_y = y[index[i]]
+            area = np.abs((prev_x - mean_x) * (y[start:stop] - prev_y)
+                          - (prev_x - x[start:stop]) * (mean_y - prev_y))
+            index[i + 1] = start + np.argmax(area)
+        return x[index], y[index]
+    else:
+        raise ValueError("Method must be one of {'minmax', 'lttb'}")
+
+
+class Renderer:
+    """
+    class for headless rendering of many S2P objects into image files
+
+    Figure, axes and lines are created once and reused, every file only
+    replaces data of lines. Data is decimated to the pixel width of axes.
+
+    Attributes:
+
+        _params - formatted columns to draw, one axes for each
+        _format - data format of columns {DB, MA, RI}
+        _image_format - png or svg
+        _method - decimation method, see decimate
+        _fig - matplotlib Figure with Agg canvas
+        _axes - list of axes
+        _lines - list of lines
+        _pixels - width of axes in pixels
+    """
+
+    def __init__(self, params=('S11_Mag', 'S21_Mag', 'S12_Mag', 'S22_Mag'), format='DB',
+                 image_format='png', width=1200, height=None, dpi=100, method='minmax'):
+        if image_format not in {'png', 'svg'}:
+            raise ValueError("Image format must be one of {'png', 'svg'}")
+        self._params = list(params)
+        self._format = format
+        self._image_format = image_format
+        self._method = method
+        height = height or 250 * len(self._params)
+        self._fig = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+        FigureCanvasAgg(self._fig)
+        self._axes = self._fig.subplots(len(self._params), 1, squeeze=False)[:, 0]
+        self._lines = [ax.plot([], [], linewidth=0.8)[0] for ax in self._axes]
+        for ax, param in zip(self._axes, self._params):
+            ax.set_ylabel(param)
+            ax.grid(True)
+        self._axes[-1].set_xlabel('freq')
+        self._fig.tight_layout(rect=(0, 0, 1, 0.97))
+        self._pixels = int(self._axes[0].get_window_extent().width)
+
+    def render(self, s2p, path, title=None):
+        """
+        Draw S2P into image file path, return path
+        """
+        if not isinstance(s2p, S2P):
+            raise TypeError('Object must be S2P class')
+        path = os.fspath(path)
+        format = s2p.format
+        s2p.format = self._format
+        try:
+            x = s2p.freq.freqs
+            for ax, line, param in zip(self._axes, self._lines, self._params):
+                line.set_data(*decimate(x, s2p._fcolumn(param), self._pixels, self._method))
+                ax.relim()
+                ax.autoscale_view()
+        finally:
+            s2p.format = format
+        self._axes[-1].set_xlabel('freq, {}'.format(s2p.freq.suffix))
+        self._fig.suptitle(title or '')
+        self._fig.savefig(path, format=self._image_format)
+        return path
+
+    def render_many(self, s2ps, out_dir, names=None):
+        """
+        Draw every S2P into out_dir, names are file names without extension
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        paths = []
+        for i, s2p in enumerate(s2ps):
+            name = names[i] if names is not None else '{:05d}'.format(i)
+            path = os.path.join(out_dir, '{}.{}'.format(name, self._image_format))
+            paths.append(self.render(s2p, path, title=name))
+        return paths
+
+
+_RENDERER = None
+
+
+def _init_worker(settings):
+    global _RENDERER
+    _RENDERER = Renderer(**settings)
+
+
+def _render_file(args):
+    """
+    Worker for process pool: load one file and draw it by process renderer
+    """
+    path, out_dir, freq_suffix, format = args
+    freqs, matrix, meta = _load_file((path, freq_suffix, format))
+    s2p = S2P(format=meta['format'])
+    s2p._suffix = meta['suffix']
+    s2p._z0 = meta['z0']
+    s2p._set_data(freqs, matrix)
+    name = os.path.splitext(os.path.basename(path))[0]
+    out = os.path.join(out_dir, '{}.{}'.format(name, _RENDERER._image_format))
+    return _RENDERER.render(s2p, out, title=name)
+
+
+def render_files(paths, out_dir, freq_suffix='Hz', format='DB', processes=None, chunksize=4,
+                 **settings):
+    """
+    Draw lot of .s2p / .csv files into out_dir in a process pool, return image paths
+
+    Every worker creates one Renderer (settings are its arguments, format is
+    also used for csv files) and reuses it for all its files.
+    """
+    paths = _expand_paths(paths)
+    if not paths:
+        raise ValueError('No files to render')
+    os.makedirs(out_dir, exist_ok=True)
+    settings['format'] = format
+    args = [(path, out_dir, freq_suffix, format) for path in paths]
+    if processes == 1:
+        _init_worker(settings)
+        return list(map(_render_file, args))
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                             initargs=(settings,)) as pool:
+        return list(pool.map(_render_file, args, chunksize=chunksize))
@@ -0,0 +1,110 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from Dataclasses.sweep.frequency import Frequency, array_key
+
+_PLANS = OrderedDict()
+_MAX_PLANS = 64
+
+
+def grid_key(freqs):
+    """
+    Hashable key of frequency grid, Frequency object or array in Hz
+    """
+    if isinstance(freqs, Frequency):
+        return freqs.key
+    return array_key(freqs)
+
+
+def _hz(freqs):
+    if isinstance(freqs, Frequency):
+        return freqs.freqs_hz
+    return np.asarray(freqs, dtype=float)
+
+
+class InterpolationPlan:
+    """
+    class for linear interpolation from source grid onto target grid
+
+    Indices and weights are computed once and reused for any data on the
+    same pair of grids. Target points outside of the source range are
+    not extrapolated, their values are NaN.
+
+    Attributes:
+
+        _index - index of left source point for every target point
+        _weight - weight of right source point for every target point
+        _outside - mask of target points outside of the source range,
+                   None if there are none
+        _nop - number of target points
+    """
+
+    def __init__(self, source, target):
+        source = _hz(source)
+        target = _hz(target)
+        if len(source) < 2:
+            raise ValueError('Source grid must have at least two points')
+        if np.any(np.diff(source) <= 0):
+            raise ValueError('Source grid must be strictly increasing')
+        index = np.searchsorted(source, target, side='right') - 1
+        np.clip(index, 0, len(source) - 2, out=index)
+        left = source[index]
+        weight = (target - left) / (source[index + 1] - left)
+        np.clip(weight, 0, 1, out=weight)
+        # rounding of the grid edges isn't extrapolation
+        tol = 1e-9 * (source[-1] - source[0])
+        outside = (target < source[0] - tol) | (target > source[-1] + tol)
+        self._outside = outside if outside.any() else None
+        self._index = index
+        self._weight = weight
+        self._nop = len(target)
+
+    @property
+    def nop(self):
+        return self._nop
+
+    def __call__(self, data, mode='ri'):
+        """
+        Interpolate data along the first axis
+
+        mode - 'ri' for real and imaginary parts, 'polar' for magnitude
+               and unwrapped phase
+        """
+        data = np.asarray(data)
+        weight = self._weight.reshape((-1,) + (1,) * (data.ndim - 1))
+        if mode == 'ri':
+            ans = self._interp(data, weight)
+        elif mode == 'polar':
+            mag = self._interp(np.abs(data), weight)
+            phase = self._interp(np.unwrap(np.angle(data), axis=0), weight)
+            ans = mag * np.exp(1j * phase)
+        else:
+            raise ValueError("Mode must be one of {'ri', 'polar'}")
+        if self._outside is not None:
+            ans = ans.astype(np.result_type(ans, float), copy=False)
+            ans[self._outside] = np.nan
+        return ans
+
+    def _interp(self, data, weight):
+        left = data[self._index]
+        return left + (data[self._index + 1] - left) * weight
+
+
+def get_plan(source, target):
+    """
+    Return cached InterpolationPlan for pair of grids
+
+    Grids are Frequency objects or arrays in Hz, key of analytic
+    Frequency range is computed without touching any array.
+    """
+    key = (grid_key(source), grid_key(target))
+    plan = _PLANS.get(key)
+    if plan is None:
+        plan = InterpolationPlan(source, target)
+        _PLANS[key] = plan
+        if len(_PLANS) > _MAX_PLANS:
+            _PLANS.popitem(last=False)
+    else:
+        _PLANS.move_to_end(key)
+    return plan
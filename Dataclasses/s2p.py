@@ -1,10 +1,18 @@
-import matplotlib.pyplot as plt
+import os
+from collections import Counter
+
 import numpy as np
-import pandas as pd
-import seaborn as sns
-from scipy.interpolate import interp1d
 
+from Dataclasses.binary import open_cached, write_cached
+from Dataclasses.conversions import matmul2, s2t, t2s
+from Dataclasses.metrics import compute
+from Dataclasses.resample import get_plan
 from Dataclasses.sweep.frequency import Frequency
+from Dataclasses.sweep.power import compression_point, w2dbm
+from Dataclasses.time_domain import gate, transform
+from Dataclasses.touchstone import read_touchstone, records_to_complex, write_header, write_records
+from Dataclasses.validation import check
+from Dataclasses.vector_fit import vector_fit
 
 
 class S2P:
@@ -13,7 +21,11 @@ class S2P:
 
     Attributes:
 
-        _matrix - matrix of S-params
+        _matrix - complex C-contiguous array (nop, 2, 2) of S-params
+        _dtype - storage dtype of _matrix, complex128 or complex64, formatted
+                 columns are float64 or float32 accordingly
+        _freq - float array of frequencies in Hz
+        _fmatrix - cache of formatted columns, filled on first access
             freqs - frequencies
             S11_Mag - S11 Magnitude (log?)
             S11_Phase - phase of S11
@@ -28,6 +40,11 @@ class S2P:
         _format - one of the DB, MA, RI
         _degree - True if angles in degrees, False - in radians
         _freq_suffix - one of the THz, GHz, MHz, kHz, Hz, mHz
+        _z0 - reference impedance
+        _freq_obj - Frequency object sharing memory with _freq, built on first access
+        _version - number of data changes, used as key for cached results
+        _counters - instrumentation counters of cache misses
+        _metrics - cache of derived metrics by name, dropped on data change
     """
     _NAMES_DB = ['freq', 'S11_Mag', 'S11_Phase', 'S12_Mag', 'S12_Phase',
                  'S21_Mag', 'S21_Phase', 'S22_Mag', 'S22_Phase']
@@ -35,17 +52,30 @@ class S2P:
                  'S21_Real', 'S21_Image', 'S22_Real', 'S22_Image']
 
     _NAMES = ['freq', 'S11', 'S12', 'S21', 'S22']
+    # numpy scalars and arrays defer arithmetic to S2P, see Dataclasses.expression
+    __array_ufunc__ = None
+
+    _INDEX = {'S11': (0, 0), 'S12': (0, 1), 'S21': (1, 0), 'S22': (1, 1)}
+    _PARTS = {'DB': {'Mag', 'Phase'}, 'MA': {'Mag', 'Phase'}, 'RI': {'Real', 'Image'}}
 
     def __init__(self, format='DB', degree=True, freq_suffix='Hz', sweep_type='freq',
-                 pow_unit='dBm'):
+                 pow_unit='dBm', dtype=complex):
 
         self._matrix = None
-        self._fmatrix = None
+        self._dtype = np.dtype(complex)
+        self._freq = None
+        self._freq_obj = None
+        self._version = 0
+        self._counters = Counter()
+        self._fmatrix = dict()
+        self._metrics = dict()
+        self._z0 = 50.
         self.format = format
         self.degree = degree
         self.suffix = freq_suffix
         self.sweep_type = sweep_type
         self.pow_unit = pow_unit
+        self.dtype = dtype
 
     def __str__(self):
         text = 'S2P Object'
@@ -59,8 +89,6 @@ class S2P:
     def format(self, value):
         if value in {'RI', 'MA', 'DB'}:
             self._format = value
-            if self._matrix is not None:
-                self._init_fmatrix()
         else:
             raise ValueError('Format must be one of RI, MA or DB')
 
@@ -97,13 +125,47 @@ class S2P:
         else:
             raise ValueError("Power unit must be one of {'dBm', 'W'}")
 
+    @property
+    def dtype(self):
+        return self._dtype
+
+    @dtype.setter
+    def dtype(self, value):
+        value = np.dtype(value)
+        if value not in (np.dtype(np.complex64), np.dtype(np.complex128)):
+            raise ValueError('dtype must be one of complex64, complex128')
+        if value != self._dtype:
+            self._dtype = value
+            if self._matrix is not None:
+                self._set_data(self._freq, self._matrix)
+
+    @property
+    def nbytes(self):
+        """
+        Memory of S-params, freqs and cached formatted columns in bytes
+        """
+        if self._matrix is None:
+            return 0
+        return self._matrix.nbytes + self._freq.nbytes + sum(x.nbytes for x in self._fmatrix.values())
+
+    @property
+    def z0(self):
+        return self._z0
+
+    @z0.setter
+    def z0(self, value):
+        if isinstance(value, (int, float)) and value > 0:
+            self._z0 = float(value)
+        else:
+            raise ValueError('Z0 must be positive number')
+
     @property
     def S11(self):
         return self._return_formatted_sparam('S11')
 
     @property
     def S11_(self):
-        return self._matrix['S11'].values
+        return self._readonly('S11')
 
     @property
     def S12(self):
@@ -111,7 +173,7 @@ class S2P:
 
     @property
     def S12_(self):
-        return self._matrix['S12'].values
+        return self._readonly('S12')
 
     @property
     def S21(self):
@@ -119,7 +181,7 @@ class S2P:
 
     @property
     def S21_(self):
-        return self._matrix['S21'].values
+        return self._readonly('S21')
 
     @property
     def S22(self):
@@ -127,32 +189,117 @@ class S2P:
 
     @property
     def S22_(self):
-        return self._matrix['S22'].values
+        return self._readonly('S22')
 
     @property
     def freq(self):
-        freq = Frequency(freqs=self._matrix['freq'])
-        freq.suffix = self._suffix
-        return freq
+        if self._freq_obj is None or self._freq_obj.suffix != self._suffix:
+            # object handed out before keeps its units, new one is built for new suffix
+            self._freq_obj = Frequency(freqs=self._freq)
+            self._freq_obj.suffix = self._suffix
+            self._counters['freq_builds'] += 1
+        return self._freq_obj
+
+    @property
+    def counters(self):
+        """
+        Counters of cached values built: freq_builds, fcolumn_builds, metric_builds
+        """
+        return dict(self._counters)
 
     @property
     def matrix_(self):
-        return self._matrix
+        matrix = {'freq': self._freq}
+        for s_param in self._NAMES[1:]:
+            matrix[s_param] = self._sparam(s_param)
+        import pandas as pd
+        return pd.DataFrame(matrix)
+
+    def _sparam(self, s_param):
+        return self._matrix[(slice(None),) + self._INDEX[s_param]]
+
+    def _readonly(self, s_param):
+        """
+        Read-only view of S-param, data is changed by _set_data only
+        """
+        view = self._sparam(s_param)
+        view.flags.writeable = False
+        return view
+
+    @staticmethod
+    def _own_freqs(freqs):
+        """
+        Read-only float array of frequencies, writable arrays of caller are copied
+        """
+        freqs = np.asarray(freqs, dtype=float)
+        if freqs.flags.writeable or not freqs.flags.c_contiguous:
+            freqs = np.array(freqs, dtype=float, order='C')
+            freqs.flags.writeable = False
+        return freqs
+
+    def _set_data(self, freqs, matrix):
+        freqs = self._own_freqs(freqs)
+        matrix = np.ascontiguousarray(matrix, dtype=self._dtype)
+        if matrix.shape != (len(freqs), 2, 2):
+            raise ValueError('S-matrix must have shape (nop, 2, 2)')
+        self._freq = freqs
+        self._matrix = matrix
+        self._freq_obj = None
+        self._version += 1
+        self._metrics = dict()
+        self._init_fmatrix()
 
     def _init_fmatrix(self):
-        fmatrix = pd.DataFrame()
-        fmatrix['freq'] = self._matrix['freq']
-        if self._format == 'RI':
-            for s_param in self._NAMES[1:]:
-                fmatrix[s_param + '_Real'] = np.real(self._matrix[s_param])
-                fmatrix[s_param + '_Image'] = np.imag(self._matrix[s_param])
-        elif self._format in {'DB', 'MA'}:
-            for s_param in self._NAMES[1:]:
-                fmatrix[s_param + '_Mag'] = np.abs(self._matrix[s_param])
-                fmatrix[s_param + '_Phase'] = np.angle(self._matrix[s_param], deg=self._degree)
-                if self._format == 'DB':
-                    fmatrix[s_param + '_Mag'] = self.lin2db(fmatrix[s_param + '_Mag'])
-        self._fmatrix = fmatrix
+        """
+        Drop all cached formatted columns, must be called on every data change
+        """
+        self._fmatrix = dict()
+
+    def _fcolumn(self, name):
+        """
+        Return formatted column like 'S21_Mag' for current format and degree
+
+        Columns are computed on first access and cached by
+        (parameter, part, format, degree), so switching format or degree
+        back and forth doesn't recompute anything. Magnitude in DB reuses
+        cached linear magnitude.
+        """
+        s_param, _, part = name.partition('_')
+        if s_param not in self._INDEX or part not in self._PARTS[self._format]:
+            raise KeyError('{} is not a column of {} format'.format(name, self._format))
+        if part == 'Mag':
+            key = (s_param, part, self._format == 'DB')
+        elif part == 'Phase':
+            key = (s_param, part, self._degree)
+        else:
+            key = (s_param, part)
+        column = self._fmatrix.get(key)
+        if column is None:
+            data = self._sparam(s_param)
+            if part == 'Real':
+                column = np.real(data).copy()
+            elif part == 'Image':
+                column = np.imag(data).copy()
+            elif part == 'Phase':
+                column = np.angle(data, deg=self._degree)
+            elif key[2]:
+                column = self.lin2db(self._fcolumn_mag(s_param))
+            else:
+                column = self._fcolumn_mag(s_param)
+            column.flags.writeable = False
+            self._fmatrix[key] = column
+            self._counters['fcolumn_builds'] += 1
+        return column
+
+    def _fcolumn_mag(self, s_param):
+        key = (s_param, 'Mag', False)
+        column = self._fmatrix.get(key)
+        if column is None:
+            column = np.abs(self._sparam(s_param))
+            column.flags.writeable = False
+            self._fmatrix[key] = column
+            self._counters['fcolumn_builds'] += 1
+        return column
 
     def from_list(self, data_list, freq_suffix='Hz', format='DB'):
         if len(data_list) == 9 and self._len_check(data_list):
@@ -165,7 +312,6 @@ class S2P:
             for i in range(9):
                 data_dict[names[i]] = np.asarray(data_list[i])
             self._from_dict(data_dict, freq_suffix)
-            self._init_fmatrix()
         else:
             raise ValueError('data_list must have 9 lists of the same length')
 
@@ -174,45 +320,72 @@ class S2P:
             names = self._NAMES_DB
         else:
             names = self._NAMES_RI
-        data_dict = {x: np.asarray(data_dict[x]) for x in data_dict}
         if all(x in names for x in data_dict.keys()):
             if self._len_check(data_dict):
                 self._format = format
                 self._from_dict(data_dict, freq_suffix)
-                self._init_fmatrix()
             else:
                 raise ValueError('All lists in dictionary must have the same length')
         else:
             raise ValueError('Incorrect keys in data dictionary')
 
     def _from_dict(self, data_dict, freq_suffix):
+        """
+        Fill object from dict of columns, columns of the caller are not changed
+        """
+        names = self._NAMES_RI if self._format == 'RI' else self._NAMES_DB
+        freqs = np.asarray(data_dict['freq'], dtype=float)
+        block = np.empty((len(freqs), 8))
+        for i, name in enumerate(names[1:]):
+            block[:, i] = data_dict[name]
+        self._from_block(freqs, block, freq_suffix)
+
+    def _from_block(self, freqs, block, freq_suffix, degree=None, chunk_rows=65536):
+        """
+        Convert float block (nop, 8) of S11, S12, S21, S22 pairs in current format
+
+        Conversion goes straight into preallocated S-matrix by chunks of
+        chunk_rows, so temporaries stay small; block is only read.
+        """
         self._suffix = freq_suffix
-        matrix_dict = dict()
-        freq = Frequency(freqs=data_dict['freq'], suffix=self._suffix)
-        freq.suffix = 'Hz'
-        matrix_dict['freq'] = freq.freqs
-        if self._format == 'DB':
-            data_dict['S11_Mag'] = self.db2lin(data_dict['S11_Mag'])
-            data_dict['S12_Mag'] = self.db2lin(data_dict['S12_Mag'])
-            data_dict['S21_Mag'] = self.db2lin(data_dict['S21_Mag'])
-            data_dict['S22_Mag'] = self.db2lin(data_dict['S22_Mag'])
-        if self._format in {'DB', 'MA'}:
-            if self._degree:
-                data_dict['S11_Phase'] = self.degree2rad(data_dict['S11_Phase'])
-                data_dict['S12_Phase'] = self.degree2rad(data_dict['S12_Phase'])
-                data_dict['S21_Phase'] = self.degree2rad(data_dict['S21_Phase'])
-                data_dict['S22_Phase'] = self.degree2rad(data_dict['S22_Phase'])
-            matrix_dict['S11'] = data_dict['S11_Mag'] * np.exp(1j * data_dict['S11_Phase'])
-            matrix_dict['S12'] = data_dict['S12_Mag'] * np.exp(1j * data_dict['S12_Phase'])
-            matrix_dict['S21'] = data_dict['S21_Mag'] * np.exp(1j * data_dict['S21_Phase'])
-            matrix_dict['S22'] = data_dict['S22_Mag'] * np.exp(1j * data_dict['S22_Phase'])
-        elif self._format == 'RI':
-            matrix_dict['S11'] = data_dict['S11_Real'] + 1j * data_dict['S11_Image']
-            matrix_dict['S12'] = data_dict['S12_Real'] + 1j * data_dict['S12_Image']
-            matrix_dict['S21'] = data_dict['S21_Real'] + 1j * data_dict['S21_Image']
-            matrix_dict['S22'] = data_dict['S22_Real'] + 1j * data_dict['S22_Image']
-        df = pd.DataFrame.from_dict(matrix_dict)
-        self._matrix = df
+        freq = Frequency(freqs=freqs, suffix=freq_suffix)
+        degree = self._degree if degree is None else degree
+        matrix = np.empty((freq.nop, 2, 2), dtype=self._dtype)
+        for start in range(0, freq.nop, chunk_rows):
+            part = slice(start, start + chunk_rows)
+            records_to_complex(block[part], self._format, degree, order='12_21', out=matrix[part])
+        self._set_data(freq.freqs_hz, matrix)
+
+    def from_array(self, data, freq_suffix='Hz', format='DB', degree=None, chunk_rows=65536):
+        """
+        Fill object from array without copying or changing it
+
+        data - structured array with fields of _NAMES_DB or _NAMES_RI,
+               float array (nop, 9) with columns freq, S11, S12, S21, S22
+               pairs (like csv), or any buffer of float64 values in the same
+               order (bytes, memoryview, array.array, mmap)
+        degree - True if angles in degrees, default is the object's degree
+        """
+        self.format = format
+        names = self._NAMES_RI if format == 'RI' else self._NAMES_DB
+        if isinstance(data, np.ndarray) and data.dtype.names is not None:
+            if set(data.dtype.names) != set(names):
+                raise ValueError('Fields of structured array must be {}'.format(', '.join(names)))
+            from numpy.lib.recfunctions import structured_to_unstructured
+            data = structured_to_unstructured(data[names], dtype=float)
+        elif not isinstance(data, np.ndarray):
+            view = memoryview(data)
+            if view.format in {'B', 'b', 'c'}:
+                data = np.frombuffer(view, dtype=float)
+            else:
+                data = np.asarray(view)
+        if data.ndim == 1:
+            if data.size % 9:
+                raise ValueError('Buffer size must be multiple of 9 values')
+            data = data.reshape(-1, 9)
+        if data.ndim != 2 or data.shape[1] != 9:
+            raise ValueError('Array must have shape (nop, 9)')
+        self._from_block(data[:, 0], data[:, 1:], freq_suffix, degree, chunk_rows)
 
     def lin2db(self, data):
         return 20 * np.log10(np.asarray(data))
@@ -227,10 +400,143 @@ class S2P:
         return (angle * 180) / np.pi
 
     def from_dataframe(self, df, freq_suffix='Hz', format='DB'):
-        self.from_dict(df.to_dict(orient='list'), freq_suffix=freq_suffix, format=format)
-
-    def from_s2p(self, path):
-        pass
+        names = self._NAMES_RI if format == 'RI' else self._NAMES_DB
+        if not all(x in names for x in df.columns) or not all(x in df.columns for x in names):
+            raise ValueError('Incorrect columns in data frame')
+        self.from_array(df[names].to_numpy(dtype=float), freq_suffix=freq_suffix, format=format)
+
+    def from_s2p(self, path, chunk_lines=65536):
+        freqs, matrix, options = read_touchstone(path, chunk_lines=chunk_lines)
+        self._format = options['format']
+        self._suffix = options['suffix']
+        self._z0 = options['z0']
+        self._set_data(freqs, matrix)
+
+    def to_s2p(self, path, format='DB', freq_suffix=None, precision=9, chunk_rows=65536):
+        """
+        Write S-params to Touchstone file
+
+        path - file name or opened file handle for streaming
+        format - one of DB, MA, RI
+        freq_suffix - frequency unit of the file, default is the object's suffix
+        """
+        if freq_suffix is None:
+            freq_suffix = self._suffix
+        if hasattr(path, 'write'):
+            self._write_s2p(path, format, freq_suffix, precision, chunk_rows)
+        else:
+            with open(path, 'w') as fh:
+                self._write_s2p(fh, format, freq_suffix, precision, chunk_rows)
+
+    def _write_s2p(self, fh, format, freq_suffix, precision, chunk_rows):
+        write_header(fh, freq_suffix, format, self._z0)
+        freq = Frequency(freqs=self._freq)
+        freq.suffix = freq_suffix
+        freqs = freq.freqs
+        params = [self._sparam(name) for name in ('S11', 'S21', 'S12', 'S22')]
+        for start in range(0, len(freqs), chunk_rows):
+            stop = min(start + chunk_rows, len(freqs))
+            records = np.empty((stop - start, 9))
+            records[:, 0] = freqs[start:stop]
+            for i, param in enumerate(params):
+                data = param[start:stop]
+                if format == 'RI':
+                    records[:, 2 * i + 1] = np.real(data)
+                    records[:, 2 * i + 2] = np.imag(data)
+                else:
+                    mag = np.abs(data)
+                    records[:, 2 * i + 1] = self.lin2db(mag) if format == 'DB' else mag
+                    records[:, 2 * i + 2] = np.angle(data, deg=True)
+            write_records(fh, records, precision)
+
+    def power_analysis(self, compression=1., ref_points=1):
+        """
+        P1dB (or other compression), saturation and AM/PM of S21 for power sweep
+
+        Sweep values are input powers in pow_unit, see
+        Dataclasses.sweep.power.compression_point for returned values.
+        """
+        if self._sweep_type != 'pow':
+            raise ValueError("Sweep type must be 'pow' for power analysis")
+        powers = self._freq if self._pow_unit == 'dBm' else w2dbm(self._freq)
+        return compression_point(powers, self.S21_, compression=compression, ref_points=ref_points)
+
+    def metrics(self, *names):
+        """
+        Return dict of derived metrics, see Dataclasses.metrics.compute for names
+
+        Metrics are computed in one vectorized pass over all frequencies and
+        cached until the data changes.
+        """
+        missing = [name for name in names if name not in self._metrics]
+        if missing:
+            for name, value in compute(self._freq, self._matrix, missing).items():
+                value.flags.writeable = False
+                self._metrics[name] = value
+                self._counters['metric_builds'] += 1
+        return {name: self._metrics[name] for name in names}
+
+    def metric(self, name):
+        """
+        Return one derived metric, e.g. 'k', 'mu', 'max_gain', 'group_delay', 'vswr'
+        """
+        return self.metrics(name)[name]
+
+    def check(self, passivity_tol=1e-6, reciprocity_tol=1e-6, causality_tol=None):
+        """
+        Return dict of passivity, reciprocity and causality violations
+
+        See Dataclasses.validation.check, masks have shape (nop).
+        """
+        return check(self._matrix, self._freq, passivity_tol=passivity_tol,
+                     reciprocity_tol=reciprocity_tol, causality_tol=causality_tol)
+
+    def time_domain(self, mode='bandpass', window='kaiser', beta=6., n_time=None,
+                    t_start=None, t_stop=None, step=False):
+        """
+        Return (times, response) of all S-params, response has shape (n_time, 2, 2)
+
+        All 4 S-params are transformed by one FFT, see
+        Dataclasses.time_domain.transform for arguments.
+        """
+        times, resp = transform(self._freq, np.moveaxis(self._matrix, 0, -1), mode=mode,
+                                window=window, beta=beta, n_time=n_time,
+                                t_start=t_start, t_stop=t_stop, step=step)
+        return times, np.moveaxis(resp, -1, 0)
+
+    def gated(self, t_start, t_stop, window='kaiser', beta=6.):
+        """
+        Return new S2P with responses outside of [t_start, t_stop] seconds removed
+        """
+        data = gate(self._freq, np.moveaxis(self._matrix, 0, -1), t_start, t_stop,
+                    window=window, beta=beta)
+        return self._new(self._freq, np.moveaxis(data, -1, 0))
+
+    def save_cached(self, path, dtype=None):
+        """
+        Write S-params to binary cache file, dtype is complex64 or complex128,
+        storage dtype by default
+        """
+        info = {'suffix': self._suffix, 'format': self._format, 'degree': self._degree,
+                'z0': self._z0, 'meta': [dict()]}
+        write_cached(path, self._freq, self._matrix[None], info, dtype=dtype or self._dtype)
+
+    @classmethod
+    def load_cached(cls, path):
+        """
+        Return S2P memory-mapped from binary cache file without reading it
+
+        S-params are read-only views of the file, storage dtype is the
+        dtype of the cache.
+        """
+        freqs, matrix, header = open_cached(path)
+        if header['n_files'] != 1:
+            raise ValueError('Cache holds {} files, use S2PDataset.load_cached'.format(header['n_files']))
+        s2p = S2P(format=header['format'], degree=header['degree'], dtype=header['dtype'])
+        s2p._suffix = header['suffix']
+        s2p._z0 = header['z0']
+        s2p._set_data(freqs, matrix[0])
+        return s2p
 
     def generate(self):
         pass
@@ -253,7 +559,7 @@ class S2P:
 
     def _return_Sparam(self, data):
         s_param = dict()
-        data = np.asarray(data, dtype=np.cfloat)
+        data = np.asarray(data, dtype=complex)
         if self._format == 'RI':
             s_param['Real'] = np.real(data)
             s_param['Image'] = np.imag(data)
@@ -269,87 +575,222 @@ class S2P:
             new_names = [s_param_name + '_Real', s_param_name + '_Image']
         else:
             new_names = [s_param_name + '_Mag', s_param_name + '_Phase']
-        s_param = self._fmatrix[new_names]
-        return s_param.to_dict(orient='list')
+        return {name: self._fcolumn(name).tolist() for name in new_names}
 
     def s2t(self):
-        param = self._matrix
-        param['det_s'] = param['S11'] * param['S22'] - param['S21'] * param['S12']
-        param['T11'] = (-1 * param['det_s']) / param['S21']
-        param['T12'] = param['S11'] / param['S21']
-        param['T21'] = (-1 * param['S22']) / param['S21']
-        param['T22'] = 1 / param['S21']
-        param = param[['freq', 'T11', 'T12', 'T21', 'T22']]
+        import pandas as pd
+        t = self.t_matrix_
+        param = pd.DataFrame({'freq': self._freq,
+                              'T11': t[:, 0, 0],
+                              'T12': t[:, 0, 1],
+                              'T21': t[:, 1, 0],
+                              'T22': t[:, 1, 1]})
         return param
 
+    @property
+    def t_matrix_(self):
+        """
+        New complex array (nop, 2, 2) of T-params, object is not changed
+        """
+        return s2t(self._matrix)
+
+    def _new(self, freqs, matrix):
+        s2p = S2P(format=self._format, degree=self._degree, sweep_type=self._sweep_type,
+                  pow_unit=self._pow_unit, dtype=self._dtype)
+        s2p._suffix = self._suffix
+        s2p._z0 = self._z0
+        s2p._set_data(freqs, matrix)
+        return s2p
+
+    def _check_grid(self, other):
+        if not isinstance(other, S2P):
+            raise TypeError('Networks must be S2P class')
+        if not np.array_equal(self._freq, other._freq):
+            raise ValueError('Networks must have the same frequency grid')
+        if self._z0 != other._z0:
+            raise ValueError('Networks must have the same Z0')
+
+    @staticmethod
+    def _chain(matrices):
+        """
+        Product of stack of matrices (K, nop, 2, 2) in given order
+
+        Neighbouring pairs are multiplied by one batched product on each
+        level, so K networks need log2(K) passes instead of K.
+        """
+        while matrices.shape[0] > 1:
+            pairs = matrices.shape[0] // 2
+            product = matmul2(matrices[0:2 * pairs:2], matrices[1:2 * pairs:2])
+            if matrices.shape[0] % 2:
+                product = np.concatenate((product, matrices[-1:]))
+            matrices = product
+        return matrices[0]
+
+    @classmethod
+    def cascade(cls, *networks):
+        """
+        Return new S2P of networks connected in chain (port 2 to port 1)
+        """
+        if len(networks) == 1 and not isinstance(networks[0], S2P):
+            networks = tuple(networks[0])
+        if not networks:
+            raise ValueError('At least one network must be given')
+        first = networks[0]
+        for network in networks[1:]:
+            first._check_grid(network)
+        t = np.empty((len(networks),) + first._matrix.shape, dtype=complex)
+        for i, network in enumerate(networks):
+            t[i] = s2t(network._matrix)
+        return first._new(first._freq, t2s(cls._chain(t)))
+
+    def __pow__(self, other):
+        return S2P.cascade(self, other)
+
+    def _expression(self):
+        """
+        Lazy expression of this S2P, see Dataclasses.expression
+        """
+        from Dataclasses.expression import as_expression
+        return as_expression(self)
+
+    def __add__(self, other):
+        return self._expression() + other
+
+    def __radd__(self, other):
+        return other + self._expression()
+
+    def __sub__(self, other):
+        return self._expression() - other
+
+    def __rsub__(self, other):
+        return other - self._expression()
+
+    def __mul__(self, other):
+        return self._expression() * other
+
+    def __rmul__(self, other):
+        return other * self._expression()
+
+    def __truediv__(self, other):
+        return self._expression() / other
+
+    def __rtruediv__(self, other):
+        return other / self._expression()
+
+    def __neg__(self):
+        return -self._expression()
+
+    def __abs__(self):
+        return abs(self._expression())
+
+    def resample(self, freq, mode='ri', model=None):
+        """
+        Return new S2P interpolated onto freq grid
+
+        freq - Frequency object, S2P object or array of frequencies in Hz
+        mode - 'ri' to interpolate real and imaginary parts,
+               'polar' to interpolate magnitude and unwrapped phase
+        model - RationalModel of this S2P (see fit), evaluated instead
+                of interpolation
+
+        Interpolated S-params outside of the frequency range of this S2P are NaN.
+        """
+        if isinstance(freq, S2P):
+            freq = freq._freq
+        elif not isinstance(freq, Frequency):
+            freq = np.asarray(freq, dtype=float)
+        freqs = freq.freqs_hz if isinstance(freq, Frequency) else freq
+        if model is not None:
+            return self._new(freqs, model(freqs))
+        if np.array_equal(freqs, self._freq):
+            return self._new(self._freq, self._matrix)
+        # key of grid is cached by Frequency object
+        plan = get_plan(self.freq, freq)
+        return self._new(freqs, plan(self._matrix, mode=mode))
+
+    def fit(self, n_poles=10, n_iter=10, fit_e=False):
+        """
+        Return RationalModel of all S-params with common poles
+
+        See Dataclasses.vector_fit.vector_fit, rms error of the fit is
+        stored in the model.
+        """
+        model = vector_fit(self._freq, self._matrix, n_poles=n_poles, n_iter=n_iter, fit_e=fit_e)
+        model.z0 = self._z0
+        return model
+
+    def from_model(self, model, freqs, freq_suffix='Hz'):
+        """
+        Fill object by RationalModel evaluated at freqs in freq_suffix units
+        """
+        if model.shape != (2, 2):
+            raise ValueError('Model must have shape (2, 2)')
+        freq = Frequency(freqs=freqs, suffix=freq_suffix)
+        self._suffix = freq_suffix
+        if model.z0 is not None:
+            self._z0 = model.z0
+        self._set_data(freq.freqs_hz, model(freq.freqs_hz))
+
     def plot(self, params, **kwargs):
-        sns.set_theme()
-        if isinstance(params, str):
-            params = params.split(', ')
-        plot_num = len(params)
-        if plot_num > 1:
-            nrow = (plot_num + 1) // 2
-            ncol = 2 if plot_num > 1 else 1
-            fig, axs = plt.subplots(nrow, ncol)
-            for i in range(plot_num):
-                cur_row = (i - 1) // 2
-                cur_col = 1 if i > 1 else 0
-
-                param = params[i]
-                data = self._return_Sparam(self._matrix[param].values)
-                freq = self.freq.freqs
-                first = True
-                for key in data:
-                    if first:
-                        axs[cur_row, cur_col].plot(freq, data[key])
-                        axs[cur_row, cur_col].set_title(param)
-                        first = False
-                    else:
-                        ax2 = axs[cur_row, cur_col].twinx()
-                        ax2.plot(freq, data[key], color='orange')
-        else:
-            fig, ax = plt.subplots((plot_num + 1) // 2, 2 if plot_num > 1 else 1)
-            data = self._return_Sparam(self._matrix[params[0]].values)
-            freq = self.freq.freqs
-            first = True
-            for key in data:
-                if first:
-                    ax.plot(freq, data[key])
-                    first = False
-                else:
-                    ax2 = ax.twinx()
-                    ax2.plot(freq, data[key])
-                ax.set_title(params[0])
-        plt.show()
+        from Dataclasses.plotting import plot
+        plot(self, params, **kwargs)
 
-    def plot2(self, s_params, interpol=False):
-        sns.set_theme()
+    def _plot2_data(self, s_params, interpol=False, model=None):
+        """
+        Return list of (s_param, x, y, x_full, y_full) drawn by plot2
+        """
         x = self.freq.freqs
+        dense = None
+        if model is None and interpol:
+            # order is limited by number of points, short sweeps are drawn as measured
+            n_poles = min(10, len(x) // 2)
+            if n_poles >= 2:
+                model = self.fit(n_poles=n_poles)
+        if len(x) < 1001 and model is not None:
+            dense = self.resample(np.linspace(self._freq[0], self._freq[-1], 1001), model=model)
+        data = []
         for s_param in s_params:
-            ax = plt.subplot()
-            y = self._fmatrix[s_param]
-            if len(x) < 1001 and interpol:
-                x_full = np.linspace(np.min(x), np.max(x), 1001)
-                y_full = interp1d(x, y, kind='cubic')(x_full)
+            y = self._fcolumn(s_param)
+            if dense is not None:
+                data.append((s_param, x, y, dense.freq.freqs, dense._fcolumn(s_param)))
             else:
-                x_full = x
-                y_full = y
-            sns.lineplot(x=x_full, y=y_full, ax=ax)
-            sns.scatterplot(x=x, y=y, ax=ax)
-            ax.set_title(s_param)
-            plt.show()
-
-
-
-
-pd.set_option('display.max_columns', None)
-pd.set_option('display.max_rows', None)
-
-x = pd.read_csv('s2p_example.csv')
-# print(x.to_dict(orient='list'))
-a = S2P()
-a.from_dataframe(x, freq_suffix='GHz')
-# a.format = 'RI'
-# a.plot(['S11', 'S12', 'S21', 'S22'])
-a.plot2(['S11_Mag', 'S21_Mag', 'S21_Phase', 'S12_Mag', 'S12_Phase'], interpol=True)
-# print(a.S21)
+                data.append((s_param, x, y, x, y))
+        return data
+
+    def plot2(self, s_params, interpol=False, model=None):
+        """
+        interpol - draw curve through 1001 points of rational model,
+                   model is fitted if not given, with at most len(freq) // 2
+                   poles, sweeps of less than 4 points are drawn as measured
+        """
+        from Dataclasses.plotting import plot2
+        plot2(self, s_params, interpol, model)
+
+    def render(self, path, title=None, **settings):
+        """
+        Draw decimated columns headless into PNG/SVG file path
+
+        settings are arguments of Dataclasses.plotting.Renderer, image
+        format is taken from the extension of path by default.
+        """
+        from Dataclasses.plotting import Renderer
+        path = os.fspath(path)
+        extension = os.path.splitext(path)[1][1:].lower()
+        settings.setdefault('image_format', extension or 'png')
+        return Renderer(**settings).render(self, path, title)
+
+
+if __name__ == '__main__':
+    import pandas as pd
+
+    pd.set_option('display.max_columns', None)
+    pd.set_option('display.max_rows', None)
+
+    x = pd.read_csv('s2p_example.csv')
+    # print(x.to_dict(orient='list'))
+    a = S2P()
+    a.from_dataframe(x, freq_suffix='GHz')
+    # a.format = 'RI'
+    # a.plot(['S11', 'S12', 'S21', 'S22'])
+    a.plot2(['S11_Mag', 'S21_Mag', 'S21_Phase', 'S12_Mag', 'S12_Phase'], interpol=True)
+    # print(a.S21)
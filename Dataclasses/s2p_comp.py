@@ -1,43 +1,66 @@
-import pandas as pd
+import operator
 
-from s2p import S2P
+import numpy as np
+
+from Dataclasses.s2p import S2P
 
 
 class S2PComp(S2P):
+    """
+    class for comparing two S2P objects
+
+    S2PComp is S2P of the first object: S-params, grid, format and z0 are
+    shared with it, so S21, S21_, metrics, check, to_s2p and expressions
+    work on the first object. Columns of both objects (S21_1, S21_2) and
+    sums and differences are returned by get, matrix_ is DataFrame of
+    both objects built on request.
+    If frequency grids differ, the second object is resampled onto the
+    grid of the first one, mode is one of 'ri' or 'polar' (see S2P.resample)
+    Sums and differences are lazy expressions of both objects (see
+    Dataclasses.expression), evaluated for one S-param on first request only.
+    Objects with different Z0 are compared by stored values.
+
+    Attributes:
 
-    def __init__(self, s2p1, s2p2):
+        _s2p1 - first S2P
+        _s2p2 - second S2P on the grid of the first one
+        _derived - cache of evaluated sums and differences
+    """
+    _COLUMNS = ['freq', 'S11_1', 'S11_2', 'S12_1', 'S12_2',
+                'S21_1', 'S21_2', 'S22_1', 'S22_2']
+    _DERIVED = {'S12_sum': ('S12', operator.add), 'S21_sum': ('S21', operator.add),
+                'S12_diff': ('S12', operator.sub), 'S21_diff': ('S21', operator.sub)}
+
+    def __init__(self, s2p1, s2p2, mode='ri'):
         if not isinstance(s2p1, S2P) or not isinstance(s2p2, S2P):
             raise TypeError('Both comparable objects must be S2P class')
-        super(S2PComp, self).__init__()
+        super(S2PComp, self).__init__(format=s2p1.format, degree=s2p1.degree,
+                                      sweep_type=s2p1.sweep_type, pow_unit=s2p1.pow_unit,
+                                      dtype=s2p1.dtype)
+        if not np.array_equal(s2p1._freq, s2p2._freq):
+            s2p2 = s2p2.resample(s2p1, mode=mode)
+        if s2p2._z0 != s2p1._z0:
+            # stored values are compared as is, Z0 of second object is not renormalized
+            s2p2 = s2p1._new(s2p1._freq, s2p2._matrix)
 
         self._suffix = s2p1.freq.suffix
-        self._format = s2p1.format
-        self._degree = s2p1.degree
-
-        m1 = s2p1.matrix_
-        m2 = s2p2.matrix_
-        self._matrix = pd.DataFrame()
-        self._matrix['freq'] = m1['freq']
-        self._matrix['S11_1'] = m1['S11']
-        self._matrix['S11_2'] = m2['S11']
-        self._matrix['S12_1'] = m1['S12']
-        self._matrix['S12_2'] = m2['S12']
-        self._matrix['S21_1'] = m1['S21']
-        self._matrix['S21_2'] = m2['S21']
-        self._matrix['S22_1'] = m1['S22']
-        self._matrix['S22_2'] = m2['S22']
-        self._matrix['S12_sum'] = self._matrix['S12_1'] + self._matrix['S12_2']
-        self._matrix['S21_sum'] = self._matrix['S21_1'] + self._matrix['S21_2']
-        self._matrix['S12_diff'] = self._matrix['S12_1'] - self._matrix['S12_2']
-        self._matrix['S21_diff'] = self._matrix['S21_1'] - self._matrix['S21_2']
+        self._z0 = s2p1._z0
+        self._set_data(s2p1._freq, s2p1._matrix)
+        self._s2p1 = s2p1
+        self._s2p2 = s2p2
+        self._derived = dict()
 
     @property
     def matrix_(self):
-        return self._matrix
+        matrix = {'freq': self._freq}
+        for name in self._COLUMNS[1:]:
+            matrix[name] = self._column(name)
+        import pandas as pd
+        return pd.DataFrame(matrix)
 
     @property
     def names(self):
-        return self._matrix.columns.values
+        return np.append(self._COLUMNS, list(self._DERIVED))
 
     def get(self, param):
         if param not in self.names:
@@ -49,25 +72,200 @@ class S2PComp(S2P):
         ans = None
         if param == 'freq':
             ans = self.freq
+        elif param in self._DERIVED:
+            ans = self._return_Sparam(self._derived_param(param))
         else:
-            ans = self._return_Sparam(self._matrix[param].values)
+            ans = self._return_Sparam(self._column(param))
         return ans
 
+    def _column(self, name):
+        s2p = self._s2p1 if name.endswith('_1') else self._s2p2
+        return s2p._sparam(name[:-2])
+
+    def _derived_param(self, param):
+        if param not in self._derived:
+            s_param, func = self._DERIVED[param]
+            self._derived[param] = func(self._s2p1, self._s2p2)[s_param]
+        return self._derived[param]
+
+
+class S2PPopulation:
+    """
+    class for streaming comparison of many S2P objects with golden unit
+
+    Per-frequency statistics are accumulated for formatted columns of the
+    golden unit format (e.g. S21_Mag, S21_Phase for DB). Mean and std use
+    Welford / Chan accumulators merged chunk by chunk, min and max are
+    running values, so memory doesn't depend on number of units.
+    Percentiles are taken from a uniform reservoir sample of
+    reservoir_size units, they are exact while n <= reservoir_size. The
+    reservoir is opt-in: it takes reservoir_size * nop * 8 values (8 bytes
+    each, 4 for complex64 golden unit), e.g. 256 units of 50k points are
+    about 820 MB, without it percentiles are not available.
+    Phases are not unwrapped between units, use RI format for data with
+    phase near +-180 degrees.
+
+    Attributes:
+
+        _golden - golden S2P
+        _columns - names of formatted columns
+        _golden_values - formatted golden values (nop, 8)
+        _n - number of accumulated units
+        _mean, _m2, _min, _max - accumulators (nop, 8)
+        _reservoir - random sample of units (reservoir_size, nop, 8), float32
+                     for complex64 golden unit, accumulators are always float64
+    """
+
+    def __init__(self, golden, reservoir_size=0, mode='ri', seed=None):
+        if not isinstance(golden, S2P):
+            raise TypeError('Golden unit must be S2P class')
+        self._golden = golden
+        self._mode = mode
+        if golden.format == 'RI':
+            names = S2P._NAMES_RI[1:]
+        else:
+            names = S2P._NAMES_DB[1:]
+        self._columns = names
+        self._golden_values = self._format(golden._matrix[None])[0]
+        shape = self._golden_values.shape
+        self._n = 0
+        self._mean = np.zeros(shape)
+        self._m2 = np.zeros(shape)
+        self._min = np.full(shape, np.inf)
+        self._max = np.full(shape, -np.inf)
+        sample_dtype = np.float32 if golden.dtype == np.complex64 else float
+        self._reservoir = np.empty((reservoir_size,) + shape, dtype=sample_dtype)
+        self._rng = np.random.default_rng(seed)
+
+    def __str__(self):
+        return 'S2PPopulation Object, {} units'.format(self._n)
+
+    @property
+    def n(self):
+        return self._n
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    def _format(self, matrix):
+        """
+        Formatted values (k, nop, 8) of stack of S-matrices (k, nop, 2, 2)
+        """
+        golden = self._golden
+        flat = matrix.reshape(matrix.shape[0], matrix.shape[1], 4)
+        out = np.empty(flat.shape[:2] + (8,))
+        if golden.format == 'RI':
+            out[..., 0::2] = flat.real
+            out[..., 1::2] = flat.imag
+        else:
+            out[..., 0::2] = np.abs(flat)
+            if golden.format == 'DB':
+                out[..., 0::2] = golden.lin2db(out[..., 0::2])
+            out[..., 1::2] = np.angle(flat, deg=golden.degree)
+        return out
+
+    def _matrix_of(self, s2p):
+        if not isinstance(s2p, S2P):
+            raise TypeError('Units must be S2P class')
+        if not np.array_equal(s2p._freq, self._golden._freq):
+            s2p = s2p.resample(self._golden, mode=self._mode)
+        return s2p._matrix
+
+    def add(self, s2p):
+        self.update([s2p])
+
+    def update(self, s2ps, chunk_size=16):
+        """
+        Accumulate iterable of S2P objects, chunk_size units are stacked at once
+        """
+        chunk = []
+        for s2p in s2ps:
+            chunk.append(self._matrix_of(s2p))
+            if len(chunk) == chunk_size:
+                self._update_chunk(np.stack(chunk))
+                chunk = []
+        if chunk:
+            self._update_chunk(np.stack(chunk))
+
+    def _update_chunk(self, matrix):
+        values = self._format(matrix)
+        count = values.shape[0]
+        mean = values.mean(axis=0)
+        m2 = ((values - mean) ** 2).sum(axis=0)
+        total = self._n + count
+        delta = mean - self._mean
+        self._mean += delta * (count / total)
+        self._m2 += m2 + delta ** 2 * (self._n * count / total)
+        np.minimum(self._min, values.min(axis=0), out=self._min)
+        np.maximum(self._max, values.max(axis=0), out=self._max)
+        self._sample(values)
+        self._n = total
+
+    def _sample(self, values):
+        size = self._reservoir.shape[0]
+        for i, value in enumerate(values):
+            seen = self._n + i
+            if seen < size:
+                self._reservoir[seen] = value
+            else:
+                j = self._rng.integers(0, seen + 1)
+                if j < size:
+                    self._reservoir[j] = value
+
+    def _stat(self, stat):
+        if self._n == 0:
+            raise ValueError('Population is empty')
+        if stat == 'mean':
+            return self._mean
+        elif stat == 'std':
+            return np.sqrt(self._m2 / self._n)
+        elif stat == 'min':
+            return self._min
+        elif stat == 'max':
+            return self._max
+        elif isinstance(stat, (int, float)):
+            if self._reservoir.shape[0] == 0:
+                raise ValueError('Percentiles need reservoir, set reservoir_size')
+            filled = min(self._n, self._reservoir.shape[0])
+            return np.percentile(self._reservoir[:filled], stat, axis=0)
+        else:
+            raise ValueError("Stat must be one of {'mean', 'std', 'min', 'max'} or percentile")
+
+    def get(self, stat, delta=False):
+        """
+        Return dict of per-frequency statistic for every column
+
+        stat - one of 'mean', 'std', 'min', 'max' or percentile 0..100
+        delta - if True, golden values are subtracted (except std)
+        """
+        values = self._stat(stat)
+        if delta and stat != 'std':
+            values = values - self._golden_values
+        return {name: values[:, i] for i, name in enumerate(self._columns)}
+
+    @property
+    def golden(self):
+        return {name: self._golden_values[:, i] for i, name in enumerate(self._columns)}
+
+
+if __name__ == '__main__':
+    import pandas as pd
+
+    pd.set_option('display.max_columns', None)
+    pd.set_option('display.max_rows', None)
+    a = S2P()
+    a.format = 'MA'
+    a.from_list([[1, 2, 3], [-22, -18, -15], [-45, 45, 135],
+                 [30, 36, 42], [12, 87, -165], [30, 36, 44],
+                 [12, 87, -167], [-23, -19, -16], [-45, 45, 135]], freq_suffix='GHz')
+    b = S2P()
+    b.format = 'MA'
+    b.from_list([[1, 2, 3], [-20, -16, -13], [-50, 40, 130],
+                 [28, 34, 40], [7, 80, -170], [28, 34, 42],
+                 [7, 80, -173], [-21, -17, -14], [-50, 40, 130]], freq_suffix='GHz')
 
-pd.set_option('display.max_columns', None)
-pd.set_option('display.max_rows', None)
-a = S2P()
-a.format = 'MA'
-a.from_list([[1, 2, 3], [-22, -18, -15], [-45, 45, 135],
-             [30, 36, 42], [12, 87, -165], [30, 36, 44],
-             [12, 87, -167], [-23, -19, -16], [-45, 45, 135]], freq_suffix='GHz')
-b = S2P()
-b.format = 'MA'
-b.from_list([[1, 2, 3], [-20, -16, -13], [-50, 40, 130],
-             [28, 34, 40], [7, 80, -170], [28, 34, 42],
-             [7, 80, -173], [-21, -17, -14], [-50, 40, 130]], freq_suffix='GHz')
-
-c = S2PComp(a, b)
-c.format = 'MA'
-print(c.get('S21_diff'))
-# print(c.matrix_)
+    c = S2PComp(a, b)
+    c.format = 'MA'
+    print(c.get('S21_diff'))
+    # print(c.matrix_)
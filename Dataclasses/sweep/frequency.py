@@ -1,3 +1,4 @@
+import hashlib
 from dataclasses import dataclass
 
 import numpy as np
@@ -5,13 +6,28 @@ import numpy as np
 from Exceptions.FrequencyInitException import FrequencyInitError
 
 
+def array_key(freqs):
+    """
+    Hashable key of array of frequencies in Hz, digest is taken from the
+    array buffer without copy
+    """
+    freqs = np.ascontiguousarray(freqs, dtype=float)
+    return ('array', len(freqs), hashlib.blake2b(freqs, digest_size=16).digest())
+
+
 @dataclass(init=False)
 class Frequency:
     """
     Dataclass for handling freqs
 
+    Linear and logarithmic ranges are analytic: they are stored as
+    (start, stop, nop, spacing), indexing, slicing, searchsorted and
+    comparison don't create arrays. Arrays are created only on request
+    and cached for every suffix.
+
     Attributes:
-        _freqs - array-like object that hold freq's values
+        _freqs - array-like object that hold freq's values in Hz, None
+                 for analytic range until it is requested
         _suffix - One of [THz, GHz, MHz, kHz, Hz, mHz], default Hz
         _freq_start - the lowest freq of range
         _freq_stop - the highest freq of range
@@ -19,6 +35,9 @@ class Frequency:
         _w - boolean, True, if you use cyclic freq
         _log_freq - True if using logarithmic frequency, default False
         _ratio - numeric ration for calculating using suffix
+        _spacing - 'lin' or 'log' for analytic range, None for explicit freqs
+        _cache - scaled arrays of freqs by (ratio, w)
+        _key - hashable key of the grid
     """
 
     def __init__(self, freqs=None, suffix='Hz', freq_start=None,
@@ -26,12 +45,17 @@ class Frequency:
         self.suffix = suffix
         self.w = w
         self.log_freq = log_freq
+        self._cache = dict()
+        self._key = None
 
         if freqs is not None:
             freqs = np.asarray(freqs, dtype=float)
             if self._w:
                 freqs = self.w2f(freqs)
-            self._freqs = self._ratio * freqs
+            if self._ratio != 1:
+                freqs = self._ratio * freqs
+            self._freqs = freqs
+            self._spacing = None
             self._nop = len(freqs)
             self._freq_start = np.min(self._freqs)
             self._freq_stop = np.max(self._freqs)
@@ -39,16 +63,124 @@ class Frequency:
             if w:
                 freq_start = self.w2f(freq_start)
                 freq_stop = self.w2f(freq_stop)
-            self._nop = nop
-            self._freq_start = freq_start * self._ratio
-            self._freq_stop = freq_stop * self._ratio
-            self._freqs = np.linspace(self._freq_start, self._freq_stop, num=self._nop)
+            self._nop = int(nop)
+            self._freq_start = float(freq_start * self._ratio)
+            self._freq_stop = float(freq_stop * self._ratio)
+            self._spacing = 'log' if log_freq else 'lin'
+            if log_freq and (self._freq_start <= 0 or self._freq_stop <= 0):
+                raise ValueError('Logarithmic range must have positive frequencies')
+            self._freqs = None
         else:
             raise FrequencyInitError(freq_start, freq_stop, nop)
 
+    @classmethod
+    def _analytic(cls, start, stop, nop, spacing, suffix, w):
+        freq = cls(freq_start=start, freq_stop=stop, nop=nop, log_freq=spacing == 'log')
+        freq.suffix = suffix
+        freq.w = w
+        return freq
+
     def __str__(self):
         return str(self.freqs)
 
+    def __len__(self):
+        return self._nop
+
+    def __eq__(self, other):
+        """
+        Grids are equal if their keys are equal, so analytic range is never
+        equal to explicit grid with the same points, compare freqs_hz for that
+        """
+        if not isinstance(other, Frequency):
+            return NotImplemented
+        return self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    @property
+    def key(self):
+        """
+        Hashable key of the grid, O(1) for analytic range
+        """
+        if self._key is None:
+            if self._spacing is not None:
+                self._key = (self._spacing, self._freq_start, self._freq_stop, self._nop)
+            else:
+                self._key = array_key(self._freqs)
+        return self._key
+
+    @property
+    def spacing(self):
+        return self._spacing
+
+    def _hz(self, index):
+        """
+        Frequency in Hz of analytic range for int or array of indexes
+        """
+        if self._nop == 1:
+            return self._freq_start + 0 * np.asarray(index, dtype=float)
+        part = np.asarray(index, dtype=float) / (self._nop - 1)
+        if self._spacing == 'log':
+            return self._freq_start * (self._freq_stop / self._freq_start) ** part
+        return self._freq_start + (self._freq_stop - self._freq_start) * part
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            if self._spacing is None:
+                freq = Frequency(freqs=self._freqs[item])
+                freq.suffix = self._suffix
+                freq.w = self._w
+                return freq
+            indexes = range(*item.indices(self._nop))
+            if len(indexes) == 0:
+                raise IndexError('Empty slice of frequency range')
+            return self._analytic(float(self._hz(indexes[0])), float(self._hz(indexes[-1])),
+                                  len(indexes), self._spacing, self._suffix, self._w)
+        if self._spacing is None:
+            return self._return_freq(self._freqs[item])
+        index = int(item)
+        if index < 0:
+            index += self._nop
+        if not 0 <= index < self._nop:
+            raise IndexError('Frequency index out of range')
+        return self._return_freq(float(self._hz(index)))
+
+    def searchsorted(self, value, side='left'):
+        """
+        Indexes to insert value (in current units) to keep freqs sorted
+        """
+        value = np.asarray(value, dtype=float)
+        if self._spacing is None:
+            return np.searchsorted(self.freqs, value, side=side)
+        hz = value
+        if self._w:
+            hz = self.w2f(hz)
+        hz = hz * self._ratio
+        if self._nop == 1:
+            pos = np.zeros(np.shape(hz))
+        elif self._spacing == 'log':
+            pos = np.log(hz / self._freq_start) / np.log(self._freq_stop / self._freq_start)
+            pos = pos * (self._nop - 1)
+        else:
+            pos = (hz - self._freq_start) / (self._freq_stop - self._freq_start) * (self._nop - 1)
+        index = np.clip(np.ceil(np.nan_to_num(pos, nan=0, posinf=self._nop, neginf=0)), 0, self._nop)
+        index = index.astype(np.intp)
+        # fix rounding of analytic position by exact comparison with neighbours,
+        # they are computed the same way as elements of freqs
+        prev = self._return_freq(self._hz(np.maximum(index - 1, 0)))
+        cur = self._return_freq(self._hz(np.minimum(index, self._nop - 1)))
+        if side == 'left':
+            before = (index > 0) & (prev >= value)
+            after = (index < self._nop) & (cur < value)
+        else:
+            before = (index > 0) & (prev > value)
+            after = (index < self._nop) & (cur <= value)
+        index = index - before + after
+        if index.ndim == 0:
+            return int(index)
+        return index
+
     def f2w(self, freq):
         return 2 * np.pi * freq
 
@@ -96,12 +228,29 @@ class Frequency:
 
     @property
     def freqs(self):
-        freqs = self._freqs
-        if self._w:
-            freqs = self.f2w(freqs)
-        freqs = freqs / self._ratio
+        """
+        Read-only array of freqs in current units, cached for every suffix
+        """
+        key = (self._ratio, self._w)
+        freqs = self._cache.get(key)
+        if freqs is None:
+            freqs = self.freqs_hz
+            if self._w:
+                freqs = self.f2w(freqs)
+            if self._ratio != 1:
+                freqs = freqs / self._ratio
+            elif freqs is self._freqs:
+                freqs = freqs.view()
+            freqs.flags.writeable = False
+            self._cache[key] = freqs
         return freqs
 
+    @property
+    def freqs_hz(self):
+        if self._freqs is None:
+            self._freqs = self._hz(np.arange(self._nop))
+        return self._freqs
+
     def _return_freq(self, freq):
         if self._w:
             freq = self.f2w(freq)
@@ -18,9 +18,10 @@ class Power:
         _pow_stop - the highest power of range
     """
     def __init__(self, powers=None, unit='dBm', nop=None, pow_start=None, pow_stop=None):
+        self._unit = None
         self.unit = unit
         if powers is not None:
-            self._powers = np.asarray(powers)
+            self._powers = np.asarray(powers, dtype=float)
             self._nop = len(self._powers)
             self._pow_start = np.min(self._powers)
             self._pow_stop = np.max(self._powers)
@@ -30,7 +31,7 @@ class Power:
             self._pow_stop = pow_stop
             self._powers = np.linspace(self.pow_start, self.pow_stop, self.nop)
         else:
-            raise PowerInitError(self.pow_start, self.pow_stop, self.nop)
+            raise PowerInitError(pow_start, pow_stop, nop)
 
     @property
     def unit(self):
@@ -39,7 +40,7 @@ class Power:
     @unit.setter
     def unit(self, value):
         if value in {'dBm', 'W'}:
-            if value != self.unit:
+            if self._unit is not None and value != self._unit:
                 self._recalc_power(value)
             self._unit = value
         else:
@@ -62,4 +63,73 @@ class Power:
         return self._powers
 
     def _recalc_power(self, value):
-        pass
+        if value == 'W':
+            convert = dbm2w
+        else:
+            convert = w2dbm
+        self._powers = convert(self._powers)
+        self._pow_start = convert(self._pow_start)
+        self._pow_stop = convert(self._pow_stop)
+
+
+def dbm2w(power):
+    return 10 ** ((np.asarray(power, dtype=float) - 30) / 10)
+
+
+def w2dbm(power):
+    return 10 * np.log10(np.asarray(power, dtype=float)) + 30
+
+
+def compression_point(powers, s21, compression=1., ref_points=1):
+    """
+    Compression point, saturation and AM/PM from S21 measured vs input power
+
+    powers - increasing input powers in dBm (npow)
+    s21 - complex array (..., npow), leading axes are frequencies, units etc.,
+          all of them are processed at once
+    compression - gain compression in dB, 1 for P1dB
+    ref_points - number of first points averaged for small-signal gain
+
+    Returns dict of arrays with shape of leading axes of s21:
+        gain - small-signal gain, dB
+        pin_c, pout_c - input and output power of compression point, dBm,
+                        nan if compression is not reached
+        psat - maximum output power, dBm
+        pin_sat - input power of psat, dBm
+        am_pm - phase change at compression point relative to first point, degrees
+        am_pm_max - maximum absolute phase change, degrees
+        am_pm_slope - maximum absolute phase slope, degrees/dB
+    """
+    powers = np.asarray(powers, dtype=float)
+    s21 = np.asarray(s21)
+    if s21.shape[-1] != len(powers) or len(powers) < 2:
+        raise ValueError('Last axis of s21 must match powers with at least 2 points')
+    gain = 20 * np.log10(np.abs(s21))
+    gain0 = gain[..., :ref_points].mean(axis=-1)
+    drop = gain0[..., None] - gain
+    phase = np.degrees(np.unwrap(np.angle(s21), axis=-1))
+    phase = phase - phase[..., :1]
+
+    mask = drop >= compression
+    reached = mask.any(axis=-1)
+    index = np.maximum(np.argmax(mask, axis=-1), 1)[..., None]
+    d0 = np.take_along_axis(drop, index - 1, axis=-1)[..., 0]
+    d1 = np.take_along_axis(drop, index, axis=-1)[..., 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        part = np.clip(np.where(d1 != d0, (compression - d0) / (d1 - d0), 0), 0, 1)
+    p0 = powers[index[..., 0] - 1]
+    pin_c = p0 + part * (powers[index[..., 0]] - p0)
+    ph0 = np.take_along_axis(phase, index - 1, axis=-1)[..., 0]
+    ph1 = np.take_along_axis(phase, index, axis=-1)[..., 0]
+    am_pm = ph0 + part * (ph1 - ph0)
+
+    pout = powers + gain
+    sat = np.argmax(pout, axis=-1)
+    return {'gain': gain0,
+            'pin_c': np.where(reached, pin_c, np.nan),
+            'pout_c': np.where(reached, pin_c + gain0 - compression, np.nan),
+            'psat': np.max(pout, axis=-1),
+            'pin_sat': powers[sat],
+            'am_pm': np.where(reached, am_pm, np.nan),
+            'am_pm_max': np.max(np.abs(phase), axis=-1),
+            'am_pm_slope': np.max(np.abs(np.gradient(phase, powers, axis=-1)), axis=-1)}
@@ -1,10 +1,15 @@
 import numpy as np
 import pandas as pd
 
+from Dataclasses.conversions import convert
+from Dataclasses.validation import check
+from Dataclasses.vector_fit import vector_fit
+
 
 class XNP:
     """
-    _matrix - complex 2d-array
+    _matrix - complex array (nop, N, N) of network parameters
+    _dtype - storage dtype of _matrix, complex128 or complex64
     _ports_number - int, number of ports
     _nop - number of points
     _z - float or list, impedance for ports
@@ -14,13 +19,15 @@ class XNP:
                   power unit {kW, W, mW, uW, dBm}
     _sweep_type - type of sweeping {freq, time, date, power}
     _sweep_ratio - ratio for recalculate sweep units to basic
-    _parameter - kind of network data {S, Y, Z, H, G, T}
+    _parameter - kind of network data {S, Y, Z, H, G, T, ABCD}
     _format - format of the data {DB, MA, RI}
     _use_fmatrix - boolean, show if use formatted matrix for speed up
     _fmatrix - formatted matrix
+    _converted - last requested representation (parameter, z, matrix)
     """
     def __init__(self):
-        self._matrix = np.empty(1, 1)
+        self._dtype = np.dtype(complex)
+        self._matrix = np.empty((0, 1, 1), dtype=complex)
         self._port_number = 1
         self._nop = 0
         self.z = 50
@@ -31,6 +38,7 @@ class XNP:
         self._format = 'DB'
         self._use_fmatrix = False
         self._fmatrix = None
+        self._converted = None
 
     @property
     def port_number(self):
@@ -50,6 +58,92 @@ class XNP:
     def nop(self):
         return self._nop
 
+    @property
+    def matrix_(self):
+        return self._matrix
+
+    @property
+    def dtype(self):
+        return self._dtype
+
+    @dtype.setter
+    def dtype(self, value):
+        value = np.dtype(value)
+        if value not in (np.dtype(np.complex64), np.dtype(np.complex128)):
+            raise ValueError('dtype must be one of complex64, complex128')
+        self._dtype = value
+        self._matrix = np.ascontiguousarray(self._matrix, dtype=value)
+        self._converted = None
+
+    def from_array(self, matrix, parameter='S', z=None):
+        """
+        Fill object from complex array (nop, N, N) of given parameter
+
+        z - port impedances (N) or one for all ports, current ones by default,
+            required if number of ports changes and impedances differ
+        """
+        matrix = np.ascontiguousarray(matrix, dtype=self._dtype)
+        if matrix.ndim != 3 or matrix.shape[1] != matrix.shape[2]:
+            raise ValueError('Matrix must have shape (nop, N, N)')
+        n_ports = matrix.shape[1]
+        if z is None and n_ports != self._port_number:
+            common = np.unique(self._z)
+            if len(common) != 1:
+                raise ValueError('Port impedances differ, z for {} ports must be given'.format(n_ports))
+            z = float(common[0])
+        if z is not None and np.ndim(z) and len(z) != n_ports:
+            raise ValueError('Length Z must be equal to port number')
+        self.parameter = parameter
+        self.port_number = n_ports
+        if z is not None:
+            self.z = z
+        self._matrix = matrix
+        self._nop = matrix.shape[0]
+        self._converted = None
+
+    def to(self, parameter):
+        """
+        Return matrix (nop, N, N) converted to parameter {S, Y, Z, H, G, T, ABCD}
+
+        Conversion is done for all frequencies at once, the last requested
+        representation is cached until data or impedances change.
+        Conversion is computed in complex128 and stored in storage dtype.
+        """
+        if parameter == self._parameter:
+            return self._matrix
+        z = tuple(np.asarray(self._z, dtype=float))
+        cached = self._converted
+        if cached is not None and cached[0] == parameter and cached[1] == z:
+            return cached[2]
+        matrix = convert(self._matrix.astype(complex), self._parameter, parameter, z)
+        matrix = matrix.astype(self._dtype, copy=False)
+        self._converted = (parameter, z, matrix)
+        return matrix
+
+    def check(self, passivity_tol=1e-6, reciprocity_tol=1e-6):
+        """
+        Return dict of passivity and reciprocity violations of S-params
+
+        See Dataclasses.validation.check, masks have shape (nop).
+        """
+        return check(self.to('S'), passivity_tol=passivity_tol, reciprocity_tol=reciprocity_tol)
+
+    def fit(self, freqs, n_poles=10, n_iter=10, fit_e=False):
+        """
+        Return RationalModel (N, N) of current parameter sampled at freqs in Hz
+        """
+        model = vector_fit(freqs, self._matrix, n_poles=n_poles, n_iter=n_iter, fit_e=fit_e)
+        model.z0 = [float(z) for z in self._z]
+        return model
+
+    def from_model(self, model, freqs, parameter='S'):
+        """
+        Fill object by RationalModel evaluated at freqs in Hz
+        """
+        if len(model.shape) != 2 or model.shape[0] != model.shape[1]:
+            raise ValueError('Model must have shape (N, N)')
+        self.from_array(model(freqs), parameter, z=model.z0)
+
     @property
     def z(self):
         return self._z
@@ -121,10 +215,11 @@ class XNP:
 
     @parameter.setter
     def parameter(self, value):
-        if value in {'S', 'Z', 'Y', 'H', 'G', 'T'}:
+        if value in {'S', 'Z', 'Y', 'H', 'G', 'T', 'ABCD'}:
             self._parameter = value
+            self._converted = None
         else:
-            raise ValueError('Parameter must be one of {S, Y, Z, H, G, T}')
+            raise ValueError('Parameter must be one of {S, Y, Z, H, G, T, ABCD}')
 
     @property
     def format(self):
@@ -0,0 +1,169 @@
+"""
+Time domain transform and gating of frequency sweeps
+
+All functions work along the last axis of data, any leading axes
+(S-params, files) are transformed in the same FFT call.
+Times are in seconds, frequencies in Hz.
+"""
+import numpy as np
+
+
+def get_window(nop, window='kaiser', beta=6.):
+    if window == 'kaiser':
+        return np.kaiser(nop, beta)
+    elif window == 'hann':
+        return np.hanning(nop)
+    elif window in {'rect', None}:
+        return np.ones(nop)
+    else:
+        raise ValueError("Window must be one of {'kaiser', 'hann', 'rect'}")
+
+
+def _step(freqs):
+    freqs = np.asarray(freqs, dtype=float)
+    if len(freqs) < 2:
+        raise ValueError('Time domain transform needs at least 2 frequencies')
+    step = (freqs[-1] - freqs[0]) / (len(freqs) - 1)
+    if not np.allclose(np.diff(freqs), step, rtol=1e-6, atol=0):
+        raise ValueError('Time domain transform needs uniform frequency grid')
+    return step
+
+
+def chirp_sum(x, alpha, beta, m):
+    """
+    y[j] = sum_k x[k] * exp(1j * (alpha * k + beta * k * j)) for j in range(m)
+
+    Chirp-z transform (Bluestein) on the unit circle, computed with FFT
+    of power of two length, along the last axis of x.
+    """
+    n = x.shape[-1]
+    size = 1 << int(np.ceil(np.log2(n + m - 1)))
+    k = np.arange(n)
+    u = x * np.exp(1j * (alpha * k + beta * (k * k / 2.)))
+    j = np.arange(-(n - 1), m)
+    v = np.exp(-1j * beta * (j * j / 2.))
+    kernel = np.zeros(size, dtype=complex)
+    kernel[:m] = v[n - 1:]
+    kernel[size - (n - 1):] = v[:n - 1]
+    y = np.fft.ifft(np.fft.fft(u, size, axis=-1) * np.fft.fft(kernel), axis=-1)[..., :m]
+    km = np.arange(m)
+    return y * np.exp(1j * beta * (km * km / 2.))
+
+
+def _span(t_start, t_stop, n_time, df):
+    t_start = 0. if t_start is None else t_start
+    t_stop = 1 / df if t_stop is None else t_stop
+    times = np.linspace(t_start, t_stop, n_time)
+    dt = times[1] - times[0] if n_time > 1 else 0.
+    return times, dt
+
+
+def _interp(times, resp, new_times):
+    """
+    Linear interpolation of resp (..., n) on uniform times to new_times
+    """
+    pos = np.clip((new_times - times[0]) / (times[1] - times[0]), 0, len(times) - 1)
+    left = np.minimum(pos.astype(np.intp), len(times) - 2)
+    part = pos - left
+    return resp[..., left] * (1 - part) + resp[..., left + 1] * part
+
+
+def _dc(data):
+    """
+    Real DC point (..., 1) extrapolated from first two harmonics (..., nop)
+
+    Magnitude and unwrapped phase are extrapolated separately, phase at DC
+    is rounded to 0 or pi, so delay doesn't change the DC value.
+    """
+    mag = np.abs(data[..., :2])
+    phase = np.unwrap(np.angle(data[..., :2]), axis=-1)
+    dc_mag = np.maximum(2 * mag[..., :1] - mag[..., 1:2], 0)
+    dc_phase = 2 * phase[..., :1] - phase[..., 1:2]
+    return dc_mag * np.where(np.round(dc_phase / np.pi) % 2, -1., 1.)
+
+
+def transform(freqs, data, mode='bandpass', window='kaiser', beta=6., n_time=None,
+              t_start=None, t_stop=None, step=False):
+    """
+    Transform sweep to time domain, return (times, response)
+
+    freqs - uniform frequencies in Hz (nop)
+    data - complex array (..., nop)
+    mode - 'bandpass' gives complex impulse response of any sweep,
+           'lowpass' gives real impulse response and needs harmonic
+           grid f_k = k * df, DC point is extrapolated
+    n_time - number of time points, default is nop (2 * nop for lowpass)
+    t_start, t_stop - zoomed time span, computed with chirp-z transform,
+                      by default the full alias-free span 1 / df is used
+    step - return step response (lowpass only)
+    """
+    data = np.asarray(data)
+    nop = data.shape[-1]
+    df = _step(freqs)
+    f0 = float(np.asarray(freqs)[0])
+    zoom = t_start is not None or t_stop is not None
+    if mode == 'bandpass':
+        if step:
+            raise ValueError('Step response is available only in lowpass mode')
+        xw = data * get_window(nop, window, beta)
+        if zoom:
+            n_time = n_time or nop
+            times, dt = _span(t_start, t_stop, n_time, df)
+            resp = chirp_sum(xw, 2 * np.pi * df * times[0], 2 * np.pi * df * dt, n_time) / nop
+        else:
+            n_time = max(n_time or nop, nop)
+            resp = np.fft.fftshift(np.fft.ifft(xw, n_time, axis=-1) * (n_time / nop), axes=-1)
+            times = (np.arange(n_time) - n_time // 2) / (n_time * df)
+        return times, resp * np.exp(2j * np.pi * f0 * times)
+    elif mode == 'lowpass':
+        if abs(f0 / df - 1) > 1e-3:
+            raise ValueError('Lowpass mode needs harmonic grid f_k = k * df')
+        xw = data * get_window(2 * nop + 1, window, beta)[nop + 1:]
+        dc = _dc(data)
+        size = 2 * nop
+        if zoom and not step:
+            n_time = n_time or size
+            times, dt = _span(t_start, t_stop, n_time, df)
+            alpha = 2 * np.pi * df * times[0]
+            tail = chirp_sum(xw, alpha, 2 * np.pi * df * dt, n_time) * np.exp(2j * np.pi * df * times)
+            return times, (dc + 2 * np.real(tail)) / size
+        n_full = max(n_time or size, size) if not zoom else size
+        spectrum = np.concatenate((dc + 0j, xw), axis=-1)
+        resp = np.fft.irfft(spectrum, n_full, axis=-1) * (n_full / size)
+        times = np.arange(n_full) / (n_full * df)
+        if step:
+            # impulse of windowed spectrum spreads to negative times at the end of
+            # the period, they are integrated first
+            half = n_full // 2
+            resp = np.roll(np.cumsum(np.roll(resp, half, axis=-1), axis=-1), -half, axis=-1)
+            if zoom:
+                zoomed, _ = _span(t_start, t_stop, n_time or size, df)
+                resp = _interp(times, resp, zoomed)
+                times = zoomed
+        return times, resp
+    else:
+        raise ValueError("Mode must be one of {'bandpass', 'lowpass'}")
+
+
+def gate(freqs, data, t_start, t_stop, window='kaiser', beta=6.):
+    """
+    Keep only responses between t_start and t_stop, return gated sweep
+
+    Data is windowed, transformed by inverse FFT of the same length,
+    multiplied by rectangular gate and transformed back, then divided by
+    the gated response of windowed impulse at the gate centre. Responses
+    well inside the gate are kept, with error of a few percent only at the
+    first and last points of band.
+    Window is taken without its end points, so windows that are zero
+    there (hann) don't lose the band edges.
+    """
+    data = np.asarray(data)
+    nop = data.shape[-1]
+    df = _step(freqs)
+    win = get_window(nop + 2, window, beta)[1:-1]
+    times = np.fft.fftfreq(nop, df)
+    mask = (times >= t_start) & (times <= t_stop)
+    resp = np.fft.ifft(data * win, axis=-1)
+    shift = np.exp(-2j * np.pi * np.asarray(freqs, dtype=float) * (t_start + t_stop) / 2)
+    norm = np.fft.fft(np.fft.ifft(win * shift) * mask) / shift
+    return np.fft.fft(resp * mask, axis=-1) / norm
@@ -0,0 +1,271 @@
+import os
+import re
+import warnings
+from itertools import islice
+
+import numpy as np
+
+from Exceptions.TouchstoneException import TouchstoneError
+
+_UNITS = {'THZ': 'THz', 'GHZ': 'GHz', 'MHZ': 'MHz', 'KHZ': 'kHz', 'HZ': 'Hz'}
+_RATIOS = {'THz': 10 ** 12, 'GHz': 10 ** 9, 'MHz': 10 ** 6, 'kHz': 10 ** 3, 'Hz': 1}
+
+# position of S11, S12, S21, S22 pairs inside a record
+_ORDERS = {'21_12': np.array([0, 2, 1, 3]),
+           '12_21': np.array([0, 1, 2, 3])}
+
+_RECORD_LEN = 9
+_COMMENT = re.compile(r'!.*')
+
+
+def records_to_complex(block, format='DB', degree=True, order='21_12', out=None):
+    """
+    Convert block of Touchstone records to complex S-matrix
+
+    Arguments:
+        block - float array (nop, 8), pairs of values for 4 S-params without freq column
+        format - one of DB, MA, RI
+        degree - True if angles in degrees
+        order - '21_12' (S11, S21, S12, S22 as Touchstone) or '12_21' (S11, S12, S21, S22)
+        out - optional preallocated complex array (nop, 2, 2)
+    """
+    block = np.asarray(block, dtype=float)
+    nop = block.shape[0]
+    if out is None:
+        out = np.empty((nop, 2, 2), dtype=complex)
+    flat = out.reshape(nop, 4)
+    if order == '12_21':
+        first = block[:, 0::2]
+        second = block[:, 1::2]
+    elif order in _ORDERS:
+        first = block[:, 2 * _ORDERS[order]]
+        second = block[:, 2 * _ORDERS[order] + 1]
+    else:
+        raise ValueError("Order must be one of {'12_21', '21_12'}")
+
+    if format == 'RI':
+        flat.real[...] = first
+        flat.imag[...] = second
+    elif format in {'DB', 'MA'}:
+        if format == 'DB':
+            mag = np.power(10., first / 20)
+        else:
+            mag = first
+        phase = np.radians(second) if degree else second
+        np.multiply(mag, np.cos(phase), out=flat.real)
+        np.multiply(mag, np.sin(phase), out=flat.imag)
+    else:
+        raise ValueError('Format must be one of RI, MA or DB')
+    return out
+
+
+def _parse_values(text, path):
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', DeprecationWarning)
+            values = np.fromstring(text, sep=' ')
+    except (ValueError, DeprecationWarning):
+        raise TouchstoneError('Non numeric data in network data section', path)
+    return values
+
+
+def _parse_option_line(line, options, path, line_no):
+    tokens = line[1:].split()
+    i = 0
+    while i < len(tokens):
+        token = tokens[i].upper()
+        if token in _UNITS:
+            options['suffix'] = _UNITS[token]
+        elif token in {'S', 'Y', 'Z', 'H', 'G'}:
+            options['parameter'] = token
+        elif token in {'DB', 'MA', 'RI'}:
+            options['format'] = token
+        elif token == 'R' and i + 1 < len(tokens):
+            options['z0'] = float(tokens[i + 1])
+            i += 1
+        else:
+            raise TouchstoneError('Unknown option "{}"'.format(tokens[i]), path, line_no)
+        i += 1
+
+
+def _parse_reference(text, path, line_no):
+    try:
+        return [float(x) for x in text.split()]
+    except ValueError:
+        raise TouchstoneError('Non numeric reference impedance', path, line_no)
+
+
+def _set_reference(options, path):
+    reference = options.pop('reference')
+    if not reference:
+        return
+    if any(x != reference[0] for x in reference):
+        raise TouchstoneError('Different port references are not supported', path)
+    options['z0'] = reference[0]
+
+
+def _parse_keyword(line, options, path, line_no):
+    keyword, _, value = line[1:].partition(']')
+    keyword = keyword.strip().lower()
+    value = value.strip()
+    if keyword == 'version':
+        options['version'] = value
+    elif keyword == 'number of ports':
+        if int(value) != 2:
+            raise TouchstoneError('Only 2-port files are supported', path, line_no)
+    elif keyword == 'two-port data order':
+        if value not in _ORDERS:
+            raise TouchstoneError('Unknown two-port data order "{}"'.format(value), path, line_no)
+        options['order'] = value
+    elif keyword == 'number of frequencies':
+        options['nfreq'] = int(value)
+    elif keyword == 'reference':
+        # values may continue on the next lines, they are checked after the header
+        options['reference'] = _parse_reference(value, path, line_no)
+    elif keyword == 'matrix format':
+        if value.lower() != 'full':
+            raise TouchstoneError('Only Full matrix format is supported', path, line_no)
+    elif keyword == 'network data':
+        return True
+    return False
+
+
+def _network_end(freqs, last):
+    """
+    Index of the first frequency not above the previous one or None
+
+    Network data ends there, in Touchstone 1.x noise parameters follow it.
+    """
+    stop = np.flatnonzero(np.diff(np.concatenate(([last], freqs))) <= 0)
+    return int(stop[0]) if stop.size else None
+
+
+def _estimate_capacity(path, chars, records):
+    try:
+        size = os.path.getsize(path)
+    except (OSError, TypeError):
+        return records
+    return max(records, int(size / max(chars / records, 1) * 1.05) + 1)
+
+
+def read_touchstone(path, chunk_lines=65536):
+    """
+    Read 2-port Touchstone 1.x / 2.0 file
+
+    Network data is parsed in chunks of chunk_lines lines directly into
+    preallocated complex array, so only one chunk of text is held in memory.
+
+    Returns (freqs, matrix, options):
+        freqs - float array of frequencies in Hz
+        matrix - complex array (nop, 2, 2)
+        options - dict with suffix, parameter, format, z0, version
+    """
+    options = {'suffix': 'GHz', 'parameter': 'S', 'format': 'MA', 'z0': 50.,
+               'version': '1.0', 'order': '21_12', 'nfreq': None, 'reference': None}
+    with open(path, 'r') as fh:
+        first = ''
+        line_no = 0
+        for line in fh:
+            line_no += 1
+            line = line.split('!', 1)[0].strip()
+            if not line:
+                continue
+            if line.startswith('#'):
+                _parse_option_line(line, options, path, line_no)
+            elif line.startswith('['):
+                if _parse_keyword(line, options, path, line_no):
+                    break
+            elif options['reference'] is not None and len(options['reference']) < 2:
+                options['reference'] += _parse_reference(line, path, line_no)
+            else:
+                first = line + '\n'
+                break
+        _set_reference(options, path)
+        if options['parameter'] != 'S':
+            raise TouchstoneError('Only S-parameters are supported', path)
+
+        ratio = _RATIOS[options['suffix']]
+        capacity = options['nfreq']
+        freqs = None
+        matrix = None
+        nop = 0
+        last = -np.inf
+        rest = np.empty(0)
+        chunk = first
+        while True:
+            lines = list(islice(fh, chunk_lines))
+            chunk += ''.join(lines)
+            if '!' in chunk:
+                chunk = _COMMENT.sub('', chunk)
+            end = chunk.find('[')
+            if end >= 0:
+                chunk = chunk[:end]
+                lines = []
+            values = _parse_values(chunk, path)
+            if rest.size:
+                values = np.concatenate((rest, values))
+            count = values.size // _RECORD_LEN
+            if count:
+                if matrix is None:
+                    if capacity is None:
+                        capacity = _estimate_capacity(path, len(chunk), count)
+                    capacity = max(capacity, count)
+                    freqs = np.empty(capacity)
+                    matrix = np.empty((capacity, 2, 2), dtype=complex)
+                elif nop + count > capacity:
+                    capacity = max(2 * capacity, nop + count)
+                    freqs = np.resize(freqs, capacity)
+                    matrix = np.resize(matrix, (capacity, 2, 2))
+                block = values[:count * _RECORD_LEN].reshape(count, _RECORD_LEN)
+                end = _network_end(block[:, 0], last)
+                if end is not None:
+                    # the rest of the file is noise data, it is skipped
+                    block = block[:end]
+                    count = end
+                    lines = []
+                    values = values[:0]
+                if count:
+                    last = block[-1, 0]
+                np.multiply(block[:, 0], ratio, out=freqs[nop:nop + count])
+                records_to_complex(block[:, 1:], options['format'], order=options['order'],
+                                   out=matrix[nop:nop + count])
+                nop += count
+            rest = values[count * _RECORD_LEN:]
+            chunk = ''
+            if not lines:
+                break
+
+    if rest.size and rest[0] > last:
+        raise TouchstoneError('Incomplete network data record', path)
+    if matrix is None:
+        raise TouchstoneError('File has no network data', path)
+    if options['nfreq'] is not None and options['nfreq'] != nop:
+        raise TouchstoneError('Expected {} frequencies, got {}'.format(options['nfreq'], nop), path)
+    del options['nfreq']
+    return freqs[:nop], matrix[:nop], options
+
+
+def write_header(fh, suffix='GHz', format='DB', z0=50., comments=None):
+    """
+    Write comments and option line of Touchstone 1.x file
+    """
+    if format not in {'DB', 'MA', 'RI'}:
+        raise ValueError('Format must be one of RI, MA or DB')
+    if suffix not in _RATIOS:
+        raise ValueError('suffix must be one of {THz, GHz, MHz, kHz, Hz}')
+    lines = ['! ' + line for line in (comments or [])]
+    lines.append('# {} S {} R {:g}'.format(suffix, format, z0))
+    fh.write('\n'.join(lines) + '\n')
+
+
+def write_records(fh, records, precision=9):
+    """
+    Write block of records (nop, 9) to Touchstone file
+
+    The whole block is formatted by one %-operation instead of loop over rows
+    """
+    records = np.asarray(records, dtype=float)
+    if records.size == 0:
+        return
+    row = ' '.join(['%.{}g'.format(precision + 3)] + ['%.{}g'.format(precision)] * 8) + '\n'
+    fh.write((row * records.shape[0]) % tuple(records.ravel().tolist()))
@@ -0,0 +1,111 @@
+"""
+Passivity, reciprocity and causality checks of network data
+
+Functions take complex arrays (..., nop, N, N), leading axes are files,
+all files and frequencies are checked at once. Margins are positive for
+valid data and negative for violations.
+"""
+import numpy as np
+
+from Dataclasses.time_domain import transform
+
+
+def max_singular(matrix):
+    """
+    Largest singular value (..., nop) of every matrix
+
+    2 x 2 matrices use closed form from Frobenius norm and determinant,
+    bigger ones use batched SVD.
+    """
+    matrix = np.asarray(matrix)
+    if matrix.shape[-2:] == (2, 2):
+        norm = np.sum(np.abs(matrix) ** 2, axis=(-2, -1))
+        det = matrix[..., 0, 0] * matrix[..., 1, 1] - matrix[..., 0, 1] * matrix[..., 1, 0]
+        disc = np.sqrt(np.maximum(norm * norm - 4 * np.abs(det) ** 2, 0))
+        return np.sqrt((norm + disc) / 2)
+    return np.linalg.svd(matrix, compute_uv=False)[..., 0]
+
+
+def passivity(matrix):
+    """
+    Passivity margin (..., nop): 1 - largest singular value of S
+    """
+    return 1 - max_singular(matrix)
+
+
+def reciprocity(matrix):
+    """
+    Reciprocity error (..., nop): largest |S_ij - S_ji| over all port pairs
+    """
+    matrix = np.asarray(matrix)
+    if matrix.shape[-1] < 2:
+        return np.zeros(matrix.shape[:-2])
+    return np.max(np.abs(matrix - np.swapaxes(matrix, -1, -2)), axis=(-2, -1))
+
+
+def causality(freqs, matrix, window='kaiser', beta=6., guard=4):
+    """
+    Causality error (..., N, N): peak of impulse response at negative time
+    relative to its overall peak
+
+    Bandpass impulse response needs uniform frequency grid. Points closer
+    than guard time steps to zero are skipped, they hold leakage of the
+    window. Delays longer than half of 1 / df alias to negative time.
+    """
+    data = np.moveaxis(np.asarray(matrix), -3, -1)
+    times, resp = transform(freqs, data, mode='bandpass', window=window, beta=beta)
+    mag = np.abs(resp)
+    step = times[1] - times[0]
+    peak = np.max(mag, axis=-1)
+    early = mag[..., times < -guard * step]
+    if early.shape[-1] == 0:
+        return np.zeros(peak.shape)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.nan_to_num(np.max(early, axis=-1) / peak)
+
+
+def check(matrix, freqs=None, passivity_tol=1e-6, reciprocity_tol=1e-6, causality_tol=None,
+          chunk_size=256):
+    """
+    Check S-matrices (..., nop, N, N), return dict of masks and worst-case values
+
+    non_passive - mask (..., nop) of points with largest singular value
+                  above 1 + passivity_tol
+    passivity_margin - worst margin (...) over frequencies, see passivity
+    non_reciprocal - mask (..., nop) of points with reciprocity error above
+                     reciprocity_tol
+    reciprocity_error - worst error (...) over frequencies
+    causality_error, non_causal - worst error (...) and flag, only if
+                                  causality_tol is given, needs freqs
+    Leading axes are processed by chunks of chunk_size files.
+    """
+    matrix = np.asarray(matrix)
+    lead = matrix.shape[:-3]
+    flat = matrix.reshape((-1,) + matrix.shape[-3:])
+    n = flat.shape[0]
+    nop = matrix.shape[-3]
+    ans = {'non_passive': np.empty((n, nop), dtype=bool),
+           'passivity_margin': np.empty(n),
+           'non_reciprocal': np.empty((n, nop), dtype=bool),
+           'reciprocity_error': np.empty(n)}
+    if causality_tol is not None:
+        if freqs is None:
+            raise ValueError('Causality check needs freqs')
+        ans['causality_error'] = np.empty(n)
+        ans['non_causal'] = np.empty(n, dtype=bool)
+    for start in range(0, n, chunk_size):
+        part = slice(start, start + chunk_size)
+        chunk = flat[part]
+        margin = passivity(chunk)
+        ans['non_passive'][part] = margin < -passivity_tol
+        ans['passivity_margin'][part] = np.min(margin, axis=-1)
+        error = reciprocity(chunk)
+        ans['non_reciprocal'][part] = error > reciprocity_tol
+        ans['reciprocity_error'][part] = np.max(error, axis=-1)
+        if causality_tol is not None:
+            error = np.max(causality(freqs, chunk), axis=(-2, -1))
+            ans['causality_error'][part] = error
+            ans['non_causal'][part] = error > causality_tol
+    for name, value in ans.items():
+        ans[name] = value.reshape(lead + value.shape[1:])
+    return ans
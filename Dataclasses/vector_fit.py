@@ -0,0 +1,222 @@
+"""
+Rational pole/residue models of network data by vector fitting
+
+All responses of a network share one set of poles:
+H(s) = sum(r_k / (s - p_k)) + d + s * e, s = 2j * pi * f
+Poles are relocated by the Gustavsen-Semlyen iterations with the fast
+QR formulation, residues of all responses are found by one least squares.
+"""
+import json
+
+import numpy as np
+
+
+def _split(a):
+    """
+    Real least squares rows from complex ones: real parts on top of imaginary
+    """
+    return np.concatenate((a.real, a.imag), axis=-2)
+
+
+def _initial_poles(omega, n_poles):
+    low = omega[0] if omega[0] > 0 else omega[-1] / 100
+    beta = np.linspace(low, omega[-1], n_poles // 2)
+    poles = list(-beta / 100 + 1j * beta)
+    if n_poles % 2:
+        poles.append(-omega[-1] + 0j)
+    return np.array(poles)
+
+
+def _basis(s, poles):
+    """
+    Real-coefficient basis (nf, N), complex pole p stands for pair p, conj(p)
+    """
+    columns = []
+    for p in poles:
+        if p.imag == 0:
+            columns.append(1 / (s - p))
+        else:
+            a = 1 / (s - p)
+            b = 1 / (s - np.conj(p))
+            columns.append(a + b)
+            columns.append(1j * a - 1j * b)
+    return np.stack(columns, axis=-1)
+
+
+def _constant(s, fit_e):
+    columns = [np.ones_like(s)]
+    if fit_e:
+        columns.append(s)
+    return np.stack(columns, axis=-1)
+
+
+def _relocate(s, data, poles, fit_e):
+    """
+    One iteration of pole relocation, return new poles
+    """
+    phi = _basis(s, poles)
+    n = phi.shape[1]
+    own = np.concatenate((phi, _constant(s, fit_e)), axis=-1)
+    m = own.shape[1]
+    # a[k] = [own, -H_k * phi] for every response k, solved for sigma only
+    a = np.concatenate((np.broadcast_to(own, (data.shape[1],) + own.shape),
+                        -data.T[:, :, None] * phi[None]), axis=-1)
+    a = _split(a)
+    rhs = _split(data.T[:, :, None])
+    # sigma columns are shared by all responses, so they share one scale
+    scale = np.linalg.norm(a, axis=-2, keepdims=True)
+    scale[..., m:] = np.sqrt(np.sum(scale[..., m:] ** 2, axis=0))
+    scale[scale == 0] = 1
+    q, r = np.linalg.qr(a / scale)
+    qb = np.swapaxes(q, -1, -2) @ rhs
+    sigma_a = r[:, m:, m:].reshape(-1, n)
+    sigma_b = qb[:, m:, 0].reshape(-1)
+    sigma = np.linalg.lstsq(sigma_a, sigma_b, rcond=None)[0] / scale[0, 0, m:]
+
+    lam = np.zeros((n, n))
+    b = np.zeros(n)
+    i = 0
+    for p in poles:
+        if p.imag == 0:
+            lam[i, i] = p.real
+            b[i] = 1
+            i += 1
+        else:
+            lam[i:i + 2, i:i + 2] = [[p.real, p.imag], [-p.imag, p.real]]
+            b[i] = 2
+            i += 2
+    zeros = np.linalg.eigvals(lam - np.outer(b, sigma))
+    zeros = np.where(zeros.real > 0, -np.conj(zeros), zeros)
+    tol = 1e-9 * np.abs(zeros)
+    zeros = np.where(np.abs(zeros.imag) <= tol, zeros.real + 0j, zeros)
+    return np.sort_complex(zeros[zeros.imag >= 0])
+
+
+def _residues(s, data, poles, fit_e):
+    phi = _basis(s, poles)
+    a = _split(np.concatenate((phi, _constant(s, fit_e)), axis=-1))
+    scale = np.linalg.norm(a, axis=0)
+    scale[scale == 0] = 1
+    x = np.linalg.lstsq(a / scale, _split(data), rcond=None)[0] / scale[:, None]
+    full = []
+    residues = []
+    i = 0
+    for p in poles:
+        if p.imag == 0:
+            full.append(p)
+            residues.append(x[i] + 0j)
+            i += 1
+        else:
+            full.extend((p, np.conj(p)))
+            residues.extend((x[i] + 1j * x[i + 1], x[i] - 1j * x[i + 1]))
+            i += 2
+    n = i
+    e = x[n + 1] if fit_e else np.zeros(data.shape[1])
+    return np.array(full), np.array(residues), x[n], e
+
+
+def vector_fit(freqs, data, n_poles=10, n_iter=10, fit_e=False):
+    """
+    Fit data (nop, ...) sampled at freqs in Hz, return RationalModel
+
+    n_poles - number of poles, complex poles come in conjugate pairs
+    n_iter - number of pole relocation iterations
+    fit_e - fit proportional term s * e, useful for inductive behaviour
+    """
+    freqs = np.asarray(freqs, dtype=float)
+    data = np.asarray(data)
+    if data.shape[0] != len(freqs):
+        raise ValueError('First axis of data must be equal to number of freqs')
+    if n_poles < 1:
+        raise ValueError('Number of poles must be one or greater')
+    shape = data.shape[1:]
+    data = data.reshape(len(freqs), -1).astype(complex)
+    omega = 2 * np.pi * np.sort(freqs)
+    norm = omega[-1] if omega[-1] > 0 else 1.
+    s = 1j * 2 * np.pi * freqs / norm
+    poles = _initial_poles(omega / norm, n_poles)
+    for _ in range(n_iter):
+        poles = _relocate(s, data, poles, fit_e)
+    poles, residues, d, e = _residues(s, data, poles, fit_e)
+    model = RationalModel(poles * norm, residues * norm, d, e / norm, shape)
+    error = model(freqs).reshape(len(freqs), -1) - data
+    model.rms = float(np.sqrt(np.mean(np.abs(error) ** 2)))
+    return model
+
+
+class RationalModel:
+    """
+    class for pole/residue model of network data
+
+    Attributes:
+
+        _poles - complex array (P) of poles in rad/s, conjugate pairs included
+        _residues - complex array (P, M) of residues for M flattened responses
+        _d - real array (M) of constant terms
+        _e - real array (M) of proportional terms
+        _shape - shape of one response, (2, 2) for S2P
+        z0 - reference impedance of fitted data or None
+        rms - rms error of the fit or None
+    """
+
+    def __init__(self, poles, residues, d, e=None, shape=None, z0=None, rms=None):
+        self._poles = np.asarray(poles, dtype=complex)
+        self._residues = np.asarray(residues, dtype=complex).reshape(len(self._poles), -1)
+        self._d = np.asarray(d, dtype=float).reshape(-1)
+        self._e = np.zeros_like(self._d) if e is None else np.asarray(e, dtype=float).reshape(-1)
+        if self._residues.shape[1] != len(self._d) or len(self._e) != len(self._d):
+            raise ValueError('Residues, d and e must have the same number of responses')
+        self._shape = tuple(shape) if shape is not None else (len(self._d),)
+        if int(np.prod(self._shape)) != len(self._d):
+            raise ValueError('Shape does not match number of responses')
+        self.z0 = z0
+        self.rms = rms
+
+    def __str__(self):
+        return 'RationalModel Object, {} poles, shape {}'.format(len(self._poles), self._shape)
+
+    @property
+    def poles(self):
+        return self._poles
+
+    @property
+    def residues(self):
+        return self._residues.reshape((len(self._poles),) + self._shape)
+
+    @property
+    def shape(self):
+        return self._shape
+
+    def __call__(self, freqs):
+        """
+        Evaluate model at freqs in Hz, return complex array (nop,) + shape
+        """
+        s = 2j * np.pi * np.asarray(freqs, dtype=float)
+        data = (1 / (s[:, None] - self._poles)) @ self._residues
+        data += self._d + s[:, None] * self._e
+        return data.reshape((len(s),) + self._shape)
+
+    def to_dict(self):
+        return {'poles': [[p.real, p.imag] for p in self._poles],
+                'residues': [[[r.real, r.imag] for r in row] for row in self._residues],
+                'd': self._d.tolist(), 'e': self._e.tolist(), 'shape': list(self._shape),
+                'z0': self.z0, 'rms': self.rms}
+
+    @classmethod
+    def from_dict(cls, data):
+        poles = np.array(data['poles'], dtype=float)
+        residues = np.array(data['residues'], dtype=float)
+        return cls(poles[:, 0] + 1j * poles[:, 1], residues[..., 0] + 1j * residues[..., 1],
+                   data['d'], data['e'], data['shape'], data.get('z0'), data.get('rms'))
+
+    def save(self, path):
+        """
+        Write model to JSON file
+        """
+        with open(path, 'w') as fh:
+            json.dump(self.to_dict(), fh)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as fh:
+            return cls.from_dict(json.load(fh))
@@ -0,0 +1,15 @@
+class TouchstoneError(ValueError):
+    '''
+    Exception rise if Touchstone file can't be parsed
+    '''
+
+    def __init__(self, message, path=None, line=None):
+        if path is not None:
+            if line is not None:
+                message = '{}, line {}: {}'.format(path, line, message)
+            else:
+                message = '{}: {}'.format(path, message)
+        self.path = path
+        self.line = line
+
+        super(TouchstoneError, self).__init__(message)
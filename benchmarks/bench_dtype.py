@@ -0,0 +1,115 @@
+"""
+Memory and accuracy of complex64 storage compared with complex128
+
+Synthetic sweeps (or given .s2p / .csv files) are stored in both dtypes,
+all formatted columns and derived metrics are built, memory of S2P and
+stacked dataset and the largest errors of complex64 are written as JSON.
+
+Usage (from repository root):
+    python benchmarks/bench_dtype.py --nop 100k --files 16 --output dtype.json
+    python benchmarks/bench_dtype.py --paths 'lot/*.s2p'
+"""
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from Dataclasses.dataset import S2PDataset
+
+_COLUMNS = {'DB': ('Mag', 'Phase'), 'RI': ('Real', 'Image')}
+_METRICS = ('k', 'mu', 'max_gain', 'vswr')
+
+
+def synthetic(nop, n_files, seed=0):
+    """
+    Dataset of amplifier-like sweeps from -80 dB to +30 dB with phase rotation
+    """
+    rng = np.random.default_rng(seed)
+    freqs = np.linspace(1e8, 2e10, nop)
+    mag = 10 ** (rng.uniform(-80, 30, (n_files, nop, 2, 2)) / 20)
+    phase = -2 * np.pi * freqs[:, None, None] * rng.uniform(0, 5e-9, (n_files, 1, 2, 2))
+    return S2PDataset(freqs, mag * np.exp(1j * phase))
+
+
+def _touch(s2p):
+    for format, parts in _COLUMNS.items():
+        s2p.format = format
+        for s_param in ('S11', 'S12', 'S21', 'S22'):
+            for part in parts:
+                s2p._fcolumn('{}_{}'.format(s_param, part))
+    s2p.format = 'DB'
+    s2p.metrics(*_METRICS)
+
+
+def errors(ref, low):
+    """
+    Largest absolute errors of complex64 S2P low against complex128 S2P ref
+    """
+    ans = {}
+    for format, parts in _COLUMNS.items():
+        ref.format = low.format = format
+        for part in parts:
+            diff = max(np.max(np.abs(ref._fcolumn(name).astype(float) - low._fcolumn(name)))
+                       for name in ('{}_{}'.format(x, part) for x in ('S11', 'S12', 'S21', 'S22')))
+            ans['{}_{}'.format(format, part)] = float(diff)
+    ref.format = low.format = 'DB'
+    ref_metrics = ref.metrics(*_METRICS)
+    low_metrics = low.metrics(*_METRICS)
+    for name in _METRICS:
+        a, b = ref_metrics[name], low_metrics[name].astype(float)
+        finite = np.isfinite(a) & np.isfinite(b)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rel = np.abs(a[finite] - b[finite]) / np.maximum(np.abs(a[finite]), 1e-30)
+        ans['metric_{}_rel'.format(name)] = float(np.max(rel)) if rel.size else 0.
+    return ans
+
+
+def report(dataset):
+    low = S2PDataset(dataset._freq, dataset._matrix, dataset.meta, dtype=np.complex64)
+    ans = {'n_files': len(dataset), 'nop': len(dataset._freq),
+           'dataset_bytes': {'complex128': dataset.nbytes, 'complex64': low.nbytes}}
+    s2p_bytes = {'complex128': 0, 'complex64': 0}
+    worst = {}
+    for i in range(len(dataset)):
+        ref = dataset[i]
+        small = low[i]
+        _touch(ref)
+        _touch(small)
+        s2p_bytes['complex128'] += ref.nbytes
+        s2p_bytes['complex64'] += small.nbytes
+        for name, value in errors(ref, small).items():
+            worst[name] = max(worst.get(name, 0.), value)
+    ans['s2p_bytes_with_columns'] = s2p_bytes
+    ans['ratio'] = dataset.nbytes / low.nbytes
+    ans['max_errors'] = worst
+    return ans
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Memory and accuracy of complex64 storage')
+    parser.add_argument('--nop', default='100k', help='points of synthetic sweeps, e.g. 1k, 100k')
+    parser.add_argument('--files', type=int, default=8, help='number of synthetic sweeps')
+    parser.add_argument('--paths', help='directory, glob pattern of files instead of synthetic data')
+    parser.add_argument('--output', help='JSON file for results')
+    args = parser.parse_args(argv)
+    if args.paths:
+        dataset = S2PDataset.from_files(args.paths)
+    else:
+        nop = args.nop
+        scale = {'k': 10 ** 3, 'M': 10 ** 6}
+        nop = int(float(nop[:-1]) * scale[nop[-1]]) if nop[-1] in scale else int(nop)
+        dataset = synthetic(nop, args.files)
+    result = report(dataset)
+    print(json.dumps(result, indent=1))
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(result, fh, indent=1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Import time of Dataclasses modules in fresh interpreters
+
+Every module is imported repeat times in a new process, like a pool
+worker does at start-up. Import time and process start-up time are
+written as JSON, heavy optional packages loaded by the import are
+reported. Exit code is 1 if a module exceeds the budget or loads a heavy
+package.
+
+Usage (from any directory):
+    python benchmarks/bench_import.py --budget 100 --output import.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ('Dataclasses.s2p', 'Dataclasses.dataset', 'Dataclasses.s2p_comp', 'Dataclasses.deembed',
+           'Dataclasses.live', 'Dataclasses.expression', 'functions')
+HEAVY = ('pandas', 'matplotlib', 'seaborn', 'scipy')
+
+_CHILD = '''
+import json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'import': elapsed, 'heavy': [x for x in {heavy!r} if x in sys.modules]}}))
+'''
+
+
+def measure(module, repeat):
+    imports = []
+    processes = []
+    heavy = set()
+    code = _CHILD.format(root=ROOT, module=module, heavy=HEAVY)
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        processes.append(time.perf_counter() - start)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        imports.append(result['import'])
+        heavy.update(result['heavy'])
+    return {'module': module, 'import_min': min(imports), 'import_median': statistics.median(imports),
+            'process_min': min(processes), 'process_median': statistics.median(processes),
+            'heavy': sorted(heavy), 'repeat': repeat}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Import time of Dataclasses modules')
+    parser.add_argument('--modules', default=','.join(MODULES), help='comma separated modules')
+    parser.add_argument('--repeat', type=int, default=5, help='fresh processes per module')
+    parser.add_argument('--budget', type=float, default=100., help='largest median import time, ms')
+    parser.add_argument('--output', help='JSON file for results')
+    args = parser.parse_args(argv)
+    results = []
+    failed = False
+    for module in args.modules.split(','):
+        result = measure(module, args.repeat)
+        result['over_budget'] = result['import_median'] * 1000 > args.budget
+        failed = failed or result['over_budget'] or bool(result['heavy'])
+        results.append(result)
+        print('{:>24} {:>8.1f} ms import {:>8.1f} ms process {}'.format(
+            module, result['import_median'] * 1000, result['process_median'] * 1000,
+            ' '.join(result['heavy'])))
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump({'python': sys.version.split()[0], 'budget_ms': args.budget, 'results': results},
+                      fh, indent=1)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
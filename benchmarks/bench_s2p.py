@@ -0,0 +1,177 @@
+"""
+Benchmarks of S2P ingestion, formatting, conversion and comparison
+
+Synthetic sweeps of given sizes are generated, every case is run repeat
+times and min / median times in seconds are written as JSON, so results
+of two versions can be compared.
+
+Usage (from repository root):
+    python benchmarks/bench_s2p.py --sizes 1k,100k,10M --files 8 --output new.json
+    python benchmarks/bench_s2p.py --sizes 1k,100k --compare old.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import numpy as np
+import pandas as pd
+
+from Dataclasses.dataset import S2PDataset
+from Dataclasses.s2p import S2P
+from Dataclasses.s2p_comp import S2PComp
+
+_SIZES = {'k': 10 ** 3, 'M': 10 ** 6, 'G': 10 ** 9}
+
+
+def parse_size(text):
+    text = text.strip()
+    if text[-1] in _SIZES:
+        return int(float(text[:-1]) * _SIZES[text[-1]])
+    return int(text)
+
+
+def synthetic_dict(nop, seed=0):
+    """
+    Columns of DB formatted sweep like s2p_example.csv, freqs in GHz
+    """
+    rng = np.random.default_rng(seed)
+    freqs = np.linspace(0.1, 20, nop)
+    data = {'freq': freqs}
+    for s_param in ('S11', 'S12', 'S21', 'S22'):
+        data[s_param + '_Mag'] = rng.uniform(-40, 0, nop)
+        data[s_param + '_Phase'] = rng.uniform(-180, 180, nop)
+    return data
+
+
+def synthetic_s2p(nop, seed=0):
+    s2p = S2P()
+    s2p.from_dict(synthetic_dict(nop, seed), freq_suffix='GHz')
+    return s2p
+
+
+def measure(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {'min': min(times), 'median': statistics.median(times), 'repeat': repeat}
+
+
+def _format_switch(s2p):
+    for format in ('RI', 'MA', 'DB'):
+        s2p.format = format
+        for s_param in ('S11', 'S12', 'S21', 'S22'):
+            s2p._return_formatted_sparam(s_param)
+
+
+def _cold_fmatrix(s2p):
+    s2p._init_fmatrix()
+    for s_param in ('S11', 'S12', 'S21', 'S22'):
+        s2p._fcolumn(s_param + '_Mag')
+        s2p._fcolumn(s_param + '_Phase')
+
+
+def _plot2_data(s2p, params):
+    s2p._init_fmatrix()
+    s2p._plot2_data(params)
+
+
+def cases(nop, n_files, files_max_points, path):
+    """
+    Return list of (name, func) for sweep of nop points, files are written to path
+    """
+    data = synthetic_dict(nop)
+    df = pd.DataFrame(data)
+    block = df.to_numpy()
+    s2p = synthetic_s2p(nop)
+    other = synthetic_s2p(nop, seed=1)
+    params = ['S11_Mag', 'S21_Mag', 'S21_Phase', 'S12_Mag', 'S12_Phase']
+    ans = [('from_dataframe', lambda: S2P().from_dataframe(df, freq_suffix='GHz')),
+           ('from_dict', lambda: S2P().from_dict(data, freq_suffix='GHz')),
+           ('from_array', lambda: S2P().from_array(block, freq_suffix='GHz')),
+           ('fmatrix_cold', lambda: _cold_fmatrix(s2p)),
+           ('format_switch', lambda: _format_switch(s2p)),
+           ('return_formatted_sparam', lambda: s2p._return_formatted_sparam('S21')),
+           ('s2t', s2p.s2t),
+           ('s2p_comp', lambda: S2PComp(s2p, other)),
+           ('expression_s21', lambda: (abs(s2p - other) / abs(other)).evaluate(['S21'])),
+           ('plot2_data', lambda: _plot2_data(s2p, params))]
+    if n_files and nop <= files_max_points:
+        s2ps = [s2p] * n_files
+        ans.append(('dataset_from_s2ps', lambda: S2PDataset.from_s2ps(s2ps)))
+        for i in range(n_files):
+            s2p.to_s2p(os.path.join(path, 'f{:04d}.s2p'.format(i)))
+        ans.append(('dataset_from_files', lambda: S2PDataset.from_files(path)))
+    return ans
+
+
+def _meta():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {'commit': commit, 'python': platform.python_version(), 'numpy': np.__version__,
+            'pandas': pd.__version__, 'machine': platform.machine(), 'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def run(sizes, n_files=8, repeat=5, files_max_points=100000):
+    results = []
+    for nop in sizes:
+        with tempfile.TemporaryDirectory() as path:
+            for name, func in cases(nop, n_files, files_max_points, path):
+                result = {'name': name, 'nop': nop, 'n_files': n_files if name.startswith('dataset') else 1}
+                result.update(measure(func, repeat if nop < 10 ** 6 else 1))
+                results.append(result)
+                print('{:>26} {:>10} {:>12.6f} s'.format(name, nop, result['min']))
+    return {'meta': _meta(), 'results': results}
+
+
+def compare(new, old):
+    """
+    Print ratio new / old of min times for cases present in both results
+    """
+    old_times = {(x['name'], x['nop']): x['min'] for x in old['results']}
+    for x in new['results']:
+        key = (x['name'], x['nop'])
+        if key in old_times and old_times[key] > 0:
+            print('{:>26} {:>10} {:>8.2f}x'.format(x['name'], x['nop'], x['min'] / old_times[key]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks of S2P pipeline')
+    parser.add_argument('--sizes', default='1k,100k', help='comma separated numbers of points, e.g. 1k,100k,10M')
+    parser.add_argument('--files', type=int, default=8, help='number of files for dataset cases')
+    parser.add_argument('--files-max-points', type=parse_size, default=100000,
+                        help='largest sweep used for dataset cases')
+    parser.add_argument('--repeat', type=int, default=5, help='runs of every case below 1M points')
+    parser.add_argument('--output', help='JSON file for results')
+    parser.add_argument('--compare', help='JSON file of previous results')
+    args = parser.parse_args(argv)
+    sizes = [parse_size(x) for x in args.sizes.split(',')]
+    results = run(sizes, args.files, args.repeat, args.files_max_points)
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(results, fh, indent=1)
+    if args.compare:
+        with open(args.compare) as fh:
+            compare(results, json.load(fh))
+
+
+if __name__ == '__main__':
+    main()
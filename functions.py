@@ -1,20 +1,26 @@
 import numpy as np
 
 from Dataclasses.s2p import S2P
+from Dataclasses.s2p_comp import S2PComp
 
 
-def compare_s2p(snp1, snp2, freq_tol=None):
+def compare_s2p(snp1, snp2, freq_tol=None, mode='ri'):
+    """
+    Compare two S2P objects, return S2PComp
+
+    If frequencies of both objects match within freq_tol (Hz, default is
+    half of the mean step of the coarser grid) the second object is taken as is, else
+    it is resampled onto frequencies of the first one.
+    """
     if not isinstance(snp1, S2P) or not isinstance(snp2, S2P):
         raise TypeError('Both comparable objects must be S2P class')
-    s2p_com = S2P()
     freq1 = snp1.freq
     freq2 = snp2.freq
     if freq1.nop == freq2.nop:
         if freq_tol is None:
-            atol1 = (np.max(freq1) - np.min(freq1)) / (freq1.nop * 2)
-            atol2 = (np.max(freq2) - np.min(freq2)) / (freq2.nop * 2)
-            freq_tol = np.min(atol1, atol2)
-        if np.allclose(freq1, freq2, atol=freq_tol):
-            freq = freq1.freqs
-            s11 = snp1
-
+            atol1 = (freq1.freqs_hz[-1] - freq1.freqs_hz[0]) / (freq1.nop * 2)
+            atol2 = (freq2.freqs_hz[-1] - freq2.freqs_hz[0]) / (freq2.nop * 2)
+            freq_tol = min(atol1, atol2)
+        if np.allclose(freq1.freqs_hz, freq2.freqs_hz, rtol=0, atol=freq_tol):
+            snp2 = snp2._new(snp1._freq, snp2._matrix)
+    return S2PComp(snp1, snp2, mode=mode)
@@ -0,0 +1,40 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Dataclasses.s2p import S2P
+from Dataclasses.sweep.frequency import Frequency
+
+
+@pytest.fixture
+def make_s2p():
+    """
+    Factory of S2P objects built by public constructor and S2P.from_array
+
+    matrix - complex S-matrices (nop, 2, 2), random passive data by default
+    freqs - frequencies in Hz, linear grid 1..2 GHz by default
+    freq_suffix - frequency unit of the object
+    """
+    def make(seed=0, nop=20, matrix=None, freqs=None, z0=50., format='DB', freq_suffix='Hz',
+             dtype=complex):
+        if matrix is None:
+            rng = np.random.default_rng(seed)
+            matrix = rng.uniform(0.05, 0.65, (nop, 2, 2)) * np.exp(1j * rng.uniform(-3, 3, (nop, 2, 2)))
+        matrix = np.asarray(matrix, dtype=complex)
+        nop = len(matrix)
+        block = np.empty((nop, 9))
+        freq = Frequency(freqs=np.linspace(1e9, 2e9, nop) if freqs is None else freqs)
+        freq.suffix = freq_suffix
+        block[:, 0] = freq.freqs
+        block[:, 1::2] = matrix.reshape(nop, 4).real
+        block[:, 2::2] = matrix.reshape(nop, 4).imag
+        s2p = S2P(format=format, dtype=dtype)
+        s2p.from_array(block, freq_suffix=freq_suffix, format='RI')
+        s2p.format = format
+        s2p.z0 = z0
+        return s2p
+    return make
@@ -0,0 +1,56 @@
+import mmap
+
+import numpy as np
+import pytest
+
+from Dataclasses.binary import open_cached
+from Dataclasses.dataset import S2PDataset
+from Dataclasses.s2p import S2P
+
+
+def _mapped(array):
+    while array is not None:
+        if isinstance(array, mmap.mmap):
+            return True
+        array = getattr(array, 'base', None)
+    return False
+
+
+def test_s2p_round_trip_is_mapped_and_read_only(tmp_path, make_s2p):
+    s2p = make_s2p(format='MA', z0=75., freq_suffix='GHz')
+    path = str(tmp_path / 'net.bin')
+    s2p.save_cached(path)
+    loaded = S2P.load_cached(path)
+    assert (loaded.format, loaded.z0, loaded.freq.suffix) == ('MA', 75., 'GHz')
+    assert loaded.dtype == np.complex128
+    assert np.array_equal(loaded._freq, s2p._freq)
+    assert np.array_equal(loaded._matrix, s2p._matrix)
+    assert _mapped(loaded._matrix) and _mapped(loaded._freq)
+    assert _mapped(loaded.S21_)
+    with pytest.raises(ValueError):
+        loaded.S21_[0] = 0
+    with pytest.raises(ValueError):
+        loaded._matrix[0, 0, 0] = 0
+
+
+def test_dataset_is_one_mapping(tmp_path, make_s2p):
+    s2ps = [make_s2p(i) for i in range(3)]
+    dataset = S2PDataset.from_s2ps(s2ps, meta=[{'i': i} for i in range(3)])
+    path = str(tmp_path / 'lot.bin')
+    dataset.save_cached(path, dtype=np.complex64)
+    loaded = S2PDataset.load_cached(path)
+    assert loaded.dtype == np.complex64
+    assert [meta['i'] for meta in loaded.meta] == [0, 1, 2]
+    assert _mapped(loaded._matrix)
+    assert np.allclose(loaded._matrix, dataset._matrix, atol=1e-6)
+    # files are views of the one mapping
+    assert np.shares_memory(loaded[1]._matrix, loaded._matrix)
+    with pytest.raises(ValueError, match='S2PDataset'):
+        S2P.load_cached(path)
+
+
+def test_open_cached_rejects_other_files(tmp_path):
+    path = tmp_path / 'net.s2p'
+    path.write_text('# GHz S MA R 50\n')
+    with pytest.raises(ValueError, match='binary cache'):
+        open_cached(str(path))
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from Dataclasses.conversions import PARAMETERS, abcd2s, convert, matmul2, s2abcd, s2t, t2s
+
+
+def _s(nop=5, n_ports=2, seed=0):
+    rng = np.random.default_rng(seed)
+    return 0.3 * (rng.standard_normal((nop, n_ports, n_ports))
+                  + 1j * rng.standard_normal((nop, n_ports, n_ports)))
+
+
+@pytest.mark.parametrize('parameter', sorted(PARAMETERS))
+@pytest.mark.parametrize('z0', [50., (50., 75.)])
+def test_round_trip_through_every_parameter(parameter, z0):
+    s = _s()
+    assert np.allclose(convert(convert(s, 'S', parameter, z0), parameter, 'S', z0), s)
+
+
+def test_series_impedance_closed_form():
+    z, z0 = 30 + 40j, 50.
+    abcd = np.array([[[1, z], [0, 1]]], dtype=complex)
+    s = abcd2s(abcd, z0)[0]
+    assert s[0, 0] == pytest.approx(z / (z + 2 * z0))
+    assert s[1, 0] == pytest.approx(2 * z0 / (z + 2 * z0))
+    assert np.allclose(s2abcd(s[None], z0)[0], abcd[0])
+    # series element has no Y-matrix singularity, Z-matrix is not defined
+    assert np.allclose(convert(abcd, 'ABCD', 'Y', z0)[0], [[1 / z, -1 / z], [-1 / z, 1 / z]])
+
+
+def test_t_matrices_cascade_delays():
+    phase = np.exp(-1j * np.linspace(0, 3, 7))
+    line = np.zeros((7, 2, 2), dtype=complex)
+    line[:, 0, 1] = line[:, 1, 0] = phase
+    assert np.allclose(t2s(s2t(line)), line)
+    both = t2s(matmul2(s2t(line), s2t(line)))
+    assert np.allclose(both[:, 1, 0], phase ** 2)
+    assert np.allclose(both[:, 0, 0], 0)
+
+
+def test_matmul2_matches_numpy():
+    a, b = _s(seed=1), _s(seed=2)
+    assert np.allclose(matmul2(a, b), a @ b)
+
+
+def test_unknown_parameter():
+    with pytest.raises(ValueError):
+        convert(_s(), 'S', 'X')
+
+
+def test_n_port_z_with_per_port_impedances():
+    s, z0 = _s(nop=6, n_ports=4), np.array([50., 75., 25., 100.])
+    root = np.diag(np.sqrt(z0))
+    expected = [root @ np.linalg.inv(np.eye(4) - x) @ (np.eye(4) + x) @ root for x in s]
+    assert np.allclose(convert(s, 'S', 'Z', z0), expected)
+    assert np.allclose(convert(convert(s, 'S', 'Z', z0), 'Z', 'Y', z0), np.linalg.inv(expected))
+    assert np.allclose(convert(s, 'S', 'Y', z0), np.linalg.inv(expected))
+
+
+def test_xnp_caches_last_conversion():
+    from Dataclasses.sweep.x2p import XNP
+    xnp = XNP()
+    xnp.from_array(_s(nop=6, n_ports=4), z=[50., 75., 25., 100.])
+    z = xnp.to('Z')
+    assert xnp.to('Z') is z
+    assert xnp.to('S') is xnp.matrix_
+    xnp.z = 50.
+    assert xnp.to('Z') is not z
+    assert np.allclose(xnp.to('Z'), convert(xnp.matrix_, 'S', 'Z', 50.))
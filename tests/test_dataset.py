@@ -0,0 +1,50 @@
+import pathlib
+
+import numpy as np
+import pytest
+
+from Dataclasses.dataset import S2PDataset
+from Dataclasses.s2p import S2P
+
+
+def _write(tmp_path, s2ps):
+    for i, s2p in enumerate(s2ps):
+        s2p.to_s2p(str(tmp_path / 'f{}.s2p'.format(i)), format=s2p.format)
+    return str(tmp_path)
+
+
+@pytest.mark.parametrize('as_path', [str, pathlib.Path])
+def test_from_files_stacks_files(tmp_path, make_s2p, as_path):
+    s2ps = [make_s2p(i, freq_suffix='GHz') for i in range(3)]
+    dataset = S2PDataset.from_files(as_path(_write(tmp_path, s2ps)), processes=1)
+    assert len(dataset) == 3
+    assert dataset.z0 == 50.
+    for s2p, loaded in zip(s2ps, dataset):
+        assert np.allclose(loaded._matrix, s2p._matrix, atol=1e-8)
+
+
+def test_from_files_rejects_different_z0(tmp_path, make_s2p):
+    path = _write(tmp_path, [make_s2p(0), make_s2p(1, z0=75.)])
+    with pytest.raises(ValueError, match='z0'):
+        S2PDataset.from_files(path, processes=1)
+
+
+def test_from_files_keeps_format_of_every_file(tmp_path, make_s2p):
+    s2ps = [make_s2p(0), make_s2p(1, format='RI'), make_s2p(2, format='MA')]
+    dataset = S2PDataset.from_files(_write(tmp_path, s2ps), processes=1)
+    assert [meta['format'] for meta in dataset.meta] == ['DB', 'RI', 'MA']
+    assert dataset[1].format == 'DB'
+    for s2p, loaded in zip(s2ps, dataset):
+        assert np.allclose(loaded._matrix, s2p._matrix, atol=1e-8)
+
+
+def test_getitem_int_and_slice(make_s2p):
+    dataset = S2PDataset.from_s2ps([make_s2p(i) for i in range(4)], meta=[{'i': i} for i in range(4)])
+    assert isinstance(dataset[np.int64(1)], S2P)
+    assert np.array_equal(dataset[-1]._matrix, dataset._matrix[3])
+    part = dataset[1:3]
+    assert isinstance(part, S2PDataset)
+    assert len(part) == 2
+    assert [meta['i'] for meta in part.meta] == [1, 2]
+    with pytest.raises(TypeError):
+        dataset[[0, 1]]
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from Dataclasses.deembed import Deembedding
+from Dataclasses.s2p import S2P
+
+
+@pytest.fixture
+def _s2p(make_s2p):
+    def make(seed, nop=20, z0=50.):
+        rng = np.random.default_rng(seed)
+        matrix = 0.2 * (rng.standard_normal((nop, 2, 2)) + 1j * rng.standard_normal((nop, 2, 2)))
+        # fixtures must transmit, S21 is far from zero
+        matrix[:, 1, 0] += 0.8
+        matrix[:, 0, 1] += 0.8
+        return make_s2p(matrix=matrix, z0=z0)
+    return make
+
+
+def test_apply_removes_both_fixtures(_s2p):
+    left, dut, right = _s2p(0), _s2p(1), _s2p(2)
+    measured = S2P.cascade(left, dut, right)
+    result = Deembedding(left, right).apply(measured)
+    assert np.allclose(result._matrix, dut._matrix)
+    only_left = Deembedding(left=left).apply(left ** dut)
+    assert np.allclose(only_left._matrix, dut._matrix)
+    only_right = Deembedding(right=right).apply(dut ** right)
+    assert np.allclose(only_right._matrix, dut._matrix)
+
+
+def test_apply_many_matches_apply(_s2p):
+    left, right = _s2p(0), _s2p(2)
+    deembedding = Deembedding(left, right)
+    duts = [S2P.cascade(left, _s2p(i), right) for i in range(3, 8)]
+    results = list(deembedding.apply_many(duts, batch_size=2))
+    assert len(results) == 5
+    for dut, result in zip(duts, results):
+        assert np.allclose(result._matrix, deembedding.apply(dut)._matrix)
+
+
+def test_errors(_s2p):
+    with pytest.raises(ValueError):
+        Deembedding()
+    deembedding = Deembedding(_s2p(0))
+    with pytest.raises(ValueError):
+        deembedding.apply(_s2p(1, nop=10))
+    with pytest.raises(ValueError):
+        deembedding.apply(_s2p(1, z0=75.))
+    with pytest.raises(TypeError):
+        deembedding.apply(np.zeros((20, 2, 2)))
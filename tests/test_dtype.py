@@ -0,0 +1,49 @@
+import numpy as np
+
+from Dataclasses.dataset import S2PDataset
+from Dataclasses.s2p import S2P
+from Dataclasses.s2p_comp import S2PPopulation
+from Dataclasses.sweep.x2p import XNP
+
+
+def test_complex64_storage_of_s2p(make_s2p):
+    full, half = make_s2p(), make_s2p(dtype=np.complex64)
+    assert half._matrix.dtype == np.complex64
+    assert half._matrix.nbytes * 2 == full._matrix.nbytes
+    assert half.S21_.dtype == np.complex64
+    assert half._fcolumn('S21_Mag').dtype == np.float32
+    assert np.allclose(half._matrix, full._matrix, atol=1e-6)
+    half.dtype = complex
+    assert half._matrix.dtype == np.complex128
+
+
+def test_results_of_complex64_are_promoted(make_s2p):
+    full, half = [make_s2p(0, dtype=dtype) for dtype in (complex, np.complex64)]
+    other = make_s2p(1, dtype=np.complex64)
+    k = half.metric('k')
+    assert k.dtype == np.float64
+    assert np.allclose(k, full.metric('k'), rtol=1e-5)
+    # chain is computed in complex128 and stored in dtype of the first network
+    chain = S2P.cascade(half, other, half)
+    assert chain.dtype == np.complex64
+    assert np.allclose(chain._matrix, S2P.cascade(full, make_s2p(1), full)._matrix, atol=1e-5)
+    population = S2PPopulation(half, reservoir_size=4, seed=0)
+    population.update([other, half])
+    assert population._mean.dtype == np.float64
+    assert population._reservoir.dtype == np.float32
+
+
+def test_complex64_dataset_and_xnp(make_s2p):
+    s2ps = [make_s2p(i, dtype=np.complex64) for i in range(3)]
+    dataset = S2PDataset.from_s2ps(s2ps)
+    assert dataset.dtype == np.complex64
+    assert dataset[1].dtype == np.complex64
+    assert np.shares_memory(dataset[1]._matrix, dataset._matrix)
+    assert dataset.metric('mu').dtype == np.float64
+    xnp = XNP()
+    xnp.from_array(s2ps[0]._matrix)
+    xnp.dtype = np.complex64
+    z = xnp.to('Z')
+    assert z.dtype == np.complex64
+    xnp.dtype = complex
+    assert np.allclose(z, xnp.to('Z'), rtol=1e-5)
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from Dataclasses.expression import Expression, mean
+from Dataclasses.s2p import S2P
+from Dataclasses.s2p_comp import S2PComp
+
+_NOP = 1000
+
+
+def test_arithmetic_matches_numpy_in_chunks(make_s2p):
+    a, b, c = make_s2p(0, nop=_NOP), make_s2p(1, nop=_NOP), make_s2p(2, nop=_NOP)
+    ans = ((a - b) / c).evaluate(['S21'], chunk_size=77)['S21']
+    expected = (a._matrix[:, 1, 0] - b._matrix[:, 1, 0]) / c._matrix[:, 1, 0]
+    assert np.allclose(ans, expected)
+    assert np.allclose((2. * abs(a))['S21'], 2 * np.abs(a._matrix[:, 1, 0]))
+
+
+def test_frequency_range_and_slice(make_s2p):
+    a = make_s2p(0, nop=_NOP)
+    freqs = a._freq
+    ans = (a / 2).evaluate(['S22'], freqs=(1.2e9, 1.5e9), chunk_size=10)['S22']
+    selected = (freqs >= 1.2e9) & (freqs <= 1.5e9)
+    assert np.allclose(ans, a._matrix[selected, 1, 1] / 2)
+    ans = (-a).evaluate(['S11'], freqs=slice(5, None, 3), chunk_size=7)['S11']
+    assert np.allclose(ans, -a._matrix[5::3, 0, 0])
+    with pytest.raises(ValueError):
+        a._expression().evaluate(freqs=slice(None, None, -1))
+
+
+def test_mean_of_mixed_operands(make_s2p):
+    a, b = make_s2p(0, nop=_NOP), make_s2p(1, nop=_NOP)
+    s21 = a._matrix[:, 1, 0]
+    assert np.allclose(mean([2, a])['S21'], (2 + s21) / 2)
+    assert np.allclose(mean([abs(a), a])['S21'], (np.abs(s21) + s21) / 2)
+    assert np.allclose(mean([a, b, a._expression().real()])['S21'], (s21 + b._matrix[:, 1, 0] + s21.real) / 3)
+    # operands are not changed by evaluation
+    before = a._matrix.copy()
+    mean([a, b]).evaluate(chunk_size=13)
+    assert np.array_equal(a._matrix, before)
+
+
+def test_to_s2p_and_grid_checks(make_s2p):
+    a, b = make_s2p(0, nop=_NOP), make_s2p(1, nop=_NOP)
+    s2p = (a + b).to_s2p(freqs=slice(0, 10))
+    assert isinstance(s2p, S2P)
+    assert np.allclose(s2p._matrix, a._matrix[:10] + b._matrix[:10])
+    with pytest.raises(ValueError):
+        a + make_s2p(1, nop=10)
+    with pytest.raises(ValueError):
+        a + make_s2p(1, nop=_NOP, z0=75.)
+    with pytest.raises(TypeError):
+        a + [1]
+    with pytest.raises(ValueError):
+        mean([])
+
+
+def test_comp_with_different_z0_compares_stored_values(make_s2p):
+    a, b = make_s2p(0, nop=_NOP), make_s2p(1, nop=_NOP, z0=75.)
+    comp = S2PComp(a, b)
+    diff = comp._derived_param('S21_diff')
+    assert np.allclose(diff, a._matrix[:, 1, 0] - b._matrix[:, 1, 0])
+    assert set(comp.get('S21_diff')) == {'Mag', 'Phase'}
+
+
+def test_expression_is_abstract():
+    with pytest.raises(TypeError):
+        Expression()
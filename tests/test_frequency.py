@@ -0,0 +1,70 @@
+import numpy as np
+
+from Dataclasses.dataset import S2PDataset
+from Dataclasses.resample import get_plan, grid_key
+from Dataclasses.s2p import S2P
+from Dataclasses.sweep.frequency import Frequency
+
+
+def test_analytic_range():
+    freq = Frequency(freq_start=1, freq_stop=2, nop=11, suffix='GHz')
+    assert freq.spacing == 'lin'
+    assert len(freq) == 11
+    assert np.allclose(freq.freqs_hz, np.linspace(1e9, 2e9, 11))
+    assert freq.searchsorted(1.5) == 5
+    assert freq[2:5] == Frequency(freq_start=1.2, freq_stop=1.4, nop=3, suffix='GHz')
+
+
+def test_equal_grids_have_equal_hashes():
+    points = np.linspace(1e9, 2e9, 11)
+    analytic = Frequency(freq_start=1e9, freq_stop=2e9, nop=11)
+    first = Frequency(freqs=points)
+    second = Frequency(freqs=points.copy())
+    assert first == second
+    assert hash(first) == hash(second)
+    # analytic range is a different key than explicit grid with the same points
+    assert analytic != first
+    assert len({analytic, first, second}) == 2
+    assert np.array_equal(analytic.freqs_hz, first.freqs_hz)
+
+
+def test_grid_key_of_array_and_frequency():
+    points = np.linspace(1e9, 2e9, 11)
+    assert grid_key(points) == grid_key(Frequency(freqs=points))
+    assert grid_key(points) != grid_key(points + 1)
+    assert get_plan(points, points[::2]) is get_plan(points.copy(), Frequency(freqs=points[::2]))
+
+
+def test_compare_s2p_takes_close_grid_as_is(make_s2p):
+    from functions import compare_s2p
+    a, b = (make_s2p(matrix=np.ones((11, 2, 2)), freqs=np.linspace(1e9, 2e9, 11) + shift)
+            for shift in (0., 1e6))
+    comp = compare_s2p(a, b)
+    assert np.allclose(comp._derived_param('S21_diff'), 0)
+
+
+def test_objects_keep_own_copy_of_caller_frequencies():
+    freqs = np.linspace(1e9, 2e9, 3)
+    data = {name: np.ones(3) for name in S2P._NAMES_RI[1:]}
+    data['freq'] = freqs
+    s2p = S2P()
+    s2p.from_dict(data, format='RI')
+    dataset = S2PDataset(freqs, np.zeros((2, 3, 2, 2)))
+    key = s2p.freq.key
+    freqs[0] = 0.
+    for obj in (s2p, dataset):
+        assert obj._freq[0] == 1e9
+        assert not obj._freq.flags.writeable
+    assert s2p.freq.key == key
+    assert s2p.freq == dataset.freq
+
+
+def test_plan_does_not_extrapolate():
+    source = np.linspace(1e9, 2e9, 11)
+    data = (source + 1j * source)[:, None]
+    target = np.array([0.5e9, source[0] * (1 - 1e-15), 1.55e9, 2e9 + 1e-3, 2.5e9])
+    for mode in ('ri', 'polar'):
+        ans = get_plan(source, target)(data, mode=mode)[:, 0]
+        assert np.isnan(ans[[0, 4]]).all()
+        assert np.allclose(ans[1:4], target[1:4] + 1j * target[1:4])
+    assert np.allclose(get_plan(source, target[1:4])(source), target[1:4])
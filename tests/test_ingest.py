@@ -0,0 +1,78 @@
+import array
+import copy
+
+import numpy as np
+import pytest
+
+from Dataclasses.s2p import S2P
+
+_NOP = 7
+
+
+def _block():
+    """
+    DB block (nop, 9) in MHz and expected S-matrices
+    """
+    rng = np.random.default_rng(0)
+    block = np.empty((_NOP, 9))
+    block[:, 0] = np.linspace(100., 700., _NOP)
+    block[:, 1::2] = rng.uniform(-30, -1, (_NOP, 4))
+    block[:, 2::2] = rng.uniform(-180, 180, (_NOP, 4))
+    matrix = 10 ** (block[:, 1::2] / 20) * np.exp(1j * np.radians(block[:, 2::2]))
+    return block, matrix.reshape(_NOP, 2, 2)
+
+
+def _load(data, **kwargs):
+    s2p = S2P()
+    s2p.from_array(data, freq_suffix='MHz', format='DB', **kwargs)
+    return s2p
+
+
+@pytest.mark.parametrize('kind', ['block', 'structured', 'bytes', 'memoryview', 'array'])
+def test_from_array_inputs(kind):
+    block, matrix = _block()
+    if kind == 'block':
+        data = block
+    elif kind == 'structured':
+        names = S2P._NAMES_DB[::-1]
+        data = np.empty(_NOP, dtype=[(name, float) for name in names])
+        for i, name in enumerate(S2P._NAMES_DB):
+            data[name] = block[:, i]
+    elif kind == 'bytes':
+        data = block.tobytes()
+    elif kind == 'memoryview':
+        data = memoryview(block)
+    else:
+        data = array.array('d', block.ravel())
+    before = block.copy()
+    s2p = _load(data, chunk_rows=3)
+    assert np.allclose(s2p._freq, block[:, 0] * 1e6)
+    assert np.allclose(s2p._matrix, matrix)
+    assert s2p.freq.suffix == 'MHz'
+    assert np.array_equal(block, before)
+
+
+def test_from_array_errors():
+    block, _ = _block()
+    with pytest.raises(ValueError):
+        _load(block.ravel()[:-1])
+    with pytest.raises(ValueError):
+        _load(block[:, :8])
+    with pytest.raises(ValueError):
+        _load(np.zeros(3, dtype=[(name, float) for name in S2P._NAMES_RI]))
+
+
+@pytest.mark.parametrize('as_column', [list, np.array])
+def test_from_dict_and_list_leave_caller_data(as_column):
+    block, matrix = _block()
+    data = {name: as_column(block[:, i]) for i, name in enumerate(S2P._NAMES_DB)}
+    before = copy.deepcopy(data)
+    s2p = S2P(degree=True)
+    s2p.from_dict(data, freq_suffix='MHz')
+    assert np.allclose(s2p._matrix, matrix)
+    columns = [data[name] for name in S2P._NAMES_DB]
+    s2p.from_list(columns, freq_suffix='MHz')
+    assert np.allclose(s2p._matrix, matrix)
+    for name in S2P._NAMES_DB:
+        assert type(data[name]) is type(before[name])
+        assert np.array_equal(data[name], before[name])
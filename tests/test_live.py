@@ -0,0 +1,57 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from Dataclasses.live import Acquisition, SimulatedVNA, SweepBuffer
+
+
+@pytest.fixture
+def template(make_s2p):
+    return make_s2p(matrix=np.zeros((5, 2, 2)))
+
+
+def _sweep(value, nop=5):
+    return np.full((nop, 2, 2), value, dtype=complex)
+
+
+def test_average_max_hold_and_ring(template):
+    buffer = SweepBuffer(template, depth=3)
+    for value in (1, 5, 2, 3):
+        buffer.append(_sweep(value))
+    assert len(buffer) == 3
+    assert buffer.count == 4
+    assert np.allclose(buffer.average, 10 / 3)
+    assert np.allclose(buffer.max_hold, 5)
+    assert np.allclose(buffer.latest, 3)
+    assert np.allclose(buffer.sweeps()[:, 0, 0, 0], [5, 2, 3])
+    with pytest.raises(ValueError):
+        buffer.append(np.zeros((4, 2, 2)))
+
+
+def test_to_s2p_does_not_share_memory(template):
+    buffer = SweepBuffer(template, depth=2)
+    buffer.append(_sweep(1))
+    latest = buffer.to_s2p('latest')
+    max_hold = buffer.to_s2p('max_hold')
+    buffer.append(_sweep(5))
+    buffer.append(_sweep(7))
+    assert np.allclose(latest._matrix, 1)
+    assert np.allclose(max_hold._matrix, 1)
+    with pytest.raises(ValueError):
+        buffer.to_s2p('min')
+
+
+@pytest.mark.parametrize('policy', ['drop', 'aggregate'])
+def test_acquisition_counters(template, policy):
+    buffer = SweepBuffer(template, depth=4)
+    vna = SimulatedVNA(template, rate=None, noise=0., seed=0)
+    acquisition = Acquisition(buffer, queue_size=2, policy=policy)
+    seen = []
+    acquisition.subscribe(lambda b: seen.append(b.count))
+    asyncio.run(acquisition.run(vna.sweeps(10)))
+    counters = acquisition.counters
+    assert counters['received'] == 10
+    assert counters['appended'] == len(seen) == buffer.count
+    lost = counters.get('dropped', 0) + counters.get('aggregated', 0)
+    assert counters['appended'] + lost == 10
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from Dataclasses.metrics import compute
+
+
+def _amplifier(s21=2., s12=0.1, nop=3):
+    """
+    Matched amplifier: S11 = S22 = 0, so K = (1 + |S12 S21|^2) / (2 |S12 S21|)
+    """
+    matrix = np.zeros((nop, 2, 2), dtype=complex)
+    matrix[:, 1, 0] = s21
+    matrix[:, 0, 1] = s12
+    return np.linspace(1e9, 2e9, nop), matrix
+
+
+def test_msg_is_power_ratio():
+    freqs, matrix = _amplifier(s21=10., s12=0.1)
+    assert compute(freqs, matrix, ['msg'])['msg'] == pytest.approx(20.)
+
+
+def test_k_mag_max_gain_closed_form():
+    freqs, matrix = _amplifier(s21=2., s12=0.1)
+    ans = compute(freqs, matrix, ['k', 'msg', 'mag', 'max_gain', 'delta'])
+    # |S12 S21| = 0.2, |det S| = 0.2, K = 1.04 / 0.4 = 2.6
+    assert ans['k'] == pytest.approx(2.6)
+    assert ans['delta'] == pytest.approx(0.2)
+    assert ans['msg'] == pytest.approx(10 * np.log10(20.))
+    # MAG = MSG * (K - sqrt(K^2 - 1)) = 20 * 0.2 = 4
+    assert ans['mag'] == pytest.approx(10 * np.log10(4.))
+    assert ans['max_gain'] == pytest.approx(ans['mag'])
+
+
+def test_max_gain_is_msg_when_unstable():
+    freqs, matrix = _amplifier(s21=2., s12=0.1)
+    matrix[:, 0, 0] = 0.99
+    ans = compute(freqs, matrix, ['k', 'mag', 'max_gain', 'msg'])
+    assert np.all(ans['k'] < 1)
+    assert np.all(np.isnan(ans['mag']))
+    assert np.array_equal(ans['max_gain'], ans['msg'])
+
+
+def test_vswr_return_loss_and_group_delay():
+    freqs, matrix = _amplifier(nop=101)
+    matrix[:, 0, 0] = 0.5
+    matrix[:, 1, 0] = np.exp(-2j * np.pi * freqs * 1e-9)
+    ans = compute(freqs, matrix, ['vswr', 'return_loss', 'group_delay'])
+    assert ans['vswr'][:, 0] == pytest.approx(3.)
+    assert ans['return_loss'][:, 0] == pytest.approx(20 * np.log10(2.))
+    assert ans['group_delay'][:, 1, 0] == pytest.approx(1e-9)
+
+
+def test_unknown_metric():
+    freqs, matrix = _amplifier()
+    with pytest.raises(ValueError):
+        compute(freqs, matrix, ['gain'])
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from Dataclasses.s2p_comp import S2PPopulation
+
+
+def test_streaming_stats_match_numpy(make_s2p):
+    units = [make_s2p(i, nop=30, format='RI') for i in range(1, 40)]
+    population = S2PPopulation(make_s2p(0, nop=30, format='RI'))
+    population.update(units, chunk_size=7)
+    real = np.stack([s2p._matrix[:, 1, 0].real for s2p in units])
+    assert population.n == 39
+    assert np.allclose(population.get('mean')['S21_Real'], real.mean(axis=0))
+    assert np.allclose(population.get('std')['S21_Real'], real.std(axis=0))
+    assert np.allclose(population.get('max')['S21_Real'], real.max(axis=0))
+    assert population._reservoir.nbytes == 0
+    with pytest.raises(ValueError):
+        population.get(50)
+
+
+def test_percentiles_with_reservoir(make_s2p):
+    units = [make_s2p(i, nop=30, format='RI') for i in range(1, 11)]
+    population = S2PPopulation(make_s2p(0, nop=30, format='RI'), reservoir_size=16, seed=0)
+    population.update(units)
+    real = np.stack([s2p._matrix[:, 1, 0].real for s2p in units])
+    assert np.allclose(population.get(50)['S21_Real'], np.percentile(real, 50, axis=0))
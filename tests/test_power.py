@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from Dataclasses.sweep.power import Power, compression_point, dbm2w
+
+_POWERS = np.arange(-20., 10.01, 0.5)
+
+
+def _amplifier(gain):
+    """
+    Closed-form amplifier: gain drops 0.5 dB/dB above 0 dBm and 1.5 dB/dB
+    above 4 dBm, so P1dB input is 2 dBm and saturation is at 4 dBm input;
+    phase grows 3 degrees/dB above 0 dBm
+    """
+    over = np.clip(_POWERS, 0, None)
+    gain_db = gain - 0.5 * np.clip(_POWERS, 0, 4) - 1.5 * np.clip(_POWERS - 4, 0, None)
+    return 10 ** (gain_db / 20) * np.exp(1j * np.radians(3 * over))
+
+
+def test_unit_conversion():
+    power = Power(powers=[0., 10., 30.])
+    power.unit = 'W'
+    assert np.allclose(power.powers, [1e-3, 1e-2, 1.])
+    assert (power.pow_start, power.pow_stop) == pytest.approx((1e-3, 1.))
+    power.unit = 'dBm'
+    assert np.allclose(power.powers, [0., 10., 30.])
+    power = Power(pow_start=1e-3, pow_stop=1e-1, nop=3, unit='W')
+    power.unit = 'dBm'
+    assert np.allclose(power.powers, [0., np.log10(50.5) * 10, 20.])
+
+
+def test_compression_point_of_closed_form_amplifier():
+    ans = compression_point(_POWERS, np.stack([_amplifier(10.), _amplifier(20.)]))
+    assert np.allclose(ans['gain'], [10., 20.])
+    assert np.allclose(ans['pin_c'], 2.)
+    assert np.allclose(ans['pout_c'], [11., 21.])
+    assert np.allclose(ans['psat'], [12., 22.])
+    assert np.allclose(ans['pin_sat'], 4.)
+    assert np.allclose(ans['am_pm'], 6.)
+    assert np.allclose(ans['am_pm_max'], 30.)
+    assert np.allclose(ans['am_pm_slope'], 3.)
+    linear = compression_point(_POWERS, np.full((1, len(_POWERS)), 2.))
+    assert np.isnan(linear['pin_c']).all()
+
+
+def test_s2p_power_analysis(make_s2p):
+    matrix = np.zeros((len(_POWERS), 2, 2), dtype=complex)
+    matrix[:, 1, 0] = _amplifier(15.)
+    s2p = make_s2p(matrix=matrix, freqs=dbm2w(_POWERS))
+    with pytest.raises(ValueError):
+        s2p.power_analysis()
+    s2p.sweep_type = 'pow'
+    s2p.pow_unit = 'W'
+    ans = s2p.power_analysis()
+    assert ans['pin_c'] == pytest.approx(2.)
+    assert ans['pout_c'] == pytest.approx(16.)
+    assert ans['psat'] == pytest.approx(17.)
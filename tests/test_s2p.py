@@ -0,0 +1,78 @@
+import io
+
+import numpy as np
+import pytest
+
+from Dataclasses.s2p import S2P
+from Dataclasses.s2p_comp import S2PComp
+
+
+def test_writing_does_not_change_held_frequency(make_s2p):
+    s2p = make_s2p(nop=10, freq_suffix='GHz')
+    freq = s2p.freq
+    s2p.to_s2p(io.StringIO(), freq_suffix='MHz')
+    assert freq.suffix == 'GHz'
+    assert s2p.freq.suffix == 'GHz'
+    assert np.isclose(freq.freqs[0], 1.)
+
+
+def test_frequency_follows_object_suffix(make_s2p):
+    s2p = make_s2p(nop=10, freq_suffix='GHz')
+    freq = s2p.freq
+    s2p._suffix = 'MHz'
+    assert s2p.freq.suffix == 'MHz'
+    assert np.isclose(s2p.freq.freqs[0], 1000.)
+    assert freq.suffix == 'GHz'
+    assert s2p.freq is s2p.freq
+
+
+def test_sparam_views_are_read_only(make_s2p):
+    s2p = make_s2p(nop=10)
+    s21 = s2p.S21_
+    assert np.array_equal(s21, s2p._matrix[:, 1, 0])
+    for view in (s2p.S11_, s2p.S12_, s21, s2p.S22_):
+        with pytest.raises(ValueError):
+            view[0] = 0
+    # object data itself stays writable for _set_data users
+    assert s2p._matrix.flags.writeable
+
+
+def test_render_accepts_path_objects(tmp_path, make_s2p):
+    pytest.importorskip('matplotlib')
+    s2p = make_s2p(nop=500)
+    for name in ('plot.png', 'plot.svg', 'plot'):
+        path = s2p.render(tmp_path / name, width=300)
+        assert (tmp_path / name).stat().st_size > 0
+        assert path == str(tmp_path / name)
+
+
+@pytest.mark.parametrize('nop', [1, 3, 5, 40])
+def test_plot2_data_of_short_sweeps(make_s2p, nop):
+    s2p = make_s2p(nop=nop)
+    (name, x, y, x_full, y_full), = s2p._plot2_data(['S21_Mag'], interpol=True)
+    assert np.array_equal(y, s2p._fcolumn('S21_Mag'))
+    assert len(x_full) == (1001 if nop >= 4 else nop)
+    assert np.all(np.isfinite(y_full))
+
+
+def test_comp_keeps_s2p_api_of_first_network(tmp_path, make_s2p):
+    a, b = make_s2p(0, freq_suffix='GHz'), make_s2p(1, nop=31)
+    comp = S2PComp(a, b)
+    assert np.array_equal(comp.S21_, a.S21_)
+    assert comp.S21 == a.S21
+    assert np.allclose(comp.metrics('k', 'msg')['k'], a.metrics('k')['k'])
+    assert comp.check()['non_passive'].shape == (20,)
+    assert np.allclose((comp - a)['S21'], 0)
+    path = str(tmp_path / 'comp.s2p')
+    comp.to_s2p(path)
+    loaded = S2P()
+    loaded.from_s2p(path)
+    assert np.allclose(loaded._matrix, a._matrix, atol=1e-8)
+    assert comp.freq.suffix == 'GHz'
+    # second network is resampled onto grid of the first one
+    matrix = comp.matrix_
+    assert list(matrix.columns) == list(comp.names[:9])
+    assert np.allclose(matrix['S21_2'], b.resample(a)._matrix[:, 1, 0])
+    assert np.allclose(comp.get('S21_1')['Mag'], a.S21['S21_Mag'])
+    with pytest.raises(KeyError):
+        comp.get('S21')
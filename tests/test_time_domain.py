@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from Dataclasses.time_domain import chirp_sum, gate, get_window, transform
+
+
+def _delay(freqs, delay):
+    return np.exp(-2j * np.pi * freqs * delay)
+
+
+def test_bandpass_impulse_peaks_at_delay():
+    freqs = np.linspace(1e9, 3e9, 201)
+    times, resp = transform(freqs, _delay(freqs, 5e-9))
+    assert times[np.argmax(np.abs(resp))] == pytest.approx(5e-9, abs=times[1] - times[0])
+
+
+def test_zoom_matches_full_transform():
+    freqs = np.linspace(1e9, 3e9, 201)
+    data = _delay(freqs, 5e-9) + 0.3 * _delay(freqs, 12e-9)
+    times, resp = transform(freqs, data, window='rect')
+    part = (times >= 0) & (times <= 20e-9)
+    zoomed_times, zoomed = transform(freqs, data, window='rect', t_start=times[part][0],
+                                     t_stop=times[part][-1], n_time=part.sum())
+    assert np.allclose(zoomed_times, times[part])
+    assert np.allclose(zoomed, resp[part])
+
+
+def test_chirp_sum_is_dft():
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal(16) + 1j * rng.standard_normal(16)
+    k = np.arange(16)
+    expected = [np.sum(x * np.exp(1j * (0.3 * k + 0.1 * k * j))) for j in range(10)]
+    assert np.allclose(chirp_sum(x, 0.3, 0.1, 10), expected)
+
+
+@pytest.mark.parametrize('delay, sign', [(0, 1.), (5e-9, 1.), (3e-9, -1.)])
+def test_lowpass_step_of_delayed_thru_and_short(delay, sign):
+    freqs = np.arange(1, 201) * 1e7
+    data = sign * _delay(freqs, delay)
+    times, resp = transform(freqs, data, mode='lowpass', step=True)
+    assert np.all(np.isreal(resp))
+    settled = (times > delay + 5e-9) & (times < 40e-9)
+    assert np.allclose(resp[settled], sign, atol=1e-2)
+
+
+def test_lowpass_needs_harmonic_grid():
+    freqs = np.arange(1, 201) * 1e7
+    with pytest.raises(ValueError):
+        transform(freqs + 5e6, np.ones(200), mode='lowpass')
+    with pytest.raises(ValueError):
+        transform(freqs, np.ones(200), step=True)
+
+
+@pytest.mark.parametrize('window', ['kaiser', 'hann', 'rect'])
+def test_gate_keeps_response_inside_gate_over_full_band(window):
+    freqs = np.linspace(1e9, 3e9, 201)
+    first = _delay(freqs, 1e-9)
+    gated = gate(freqs, first, -5e-9, 5e-9, window=window)
+    assert np.all(np.isfinite(gated))
+    assert np.allclose(gated, first, atol=5e-2)
+    assert np.allclose(gated[10:-10], first[10:-10], atol=2e-2)
+
+
+@pytest.mark.parametrize('window', ['kaiser', 'hann'])
+def test_gate_removes_late_reflection(window):
+    freqs = np.linspace(1e9, 3e9, 401)
+    first = 0.5 * _delay(freqs, 2e-9)
+    gated = gate(freqs, first + 0.2 * _delay(freqs, 40e-9), -3e-9, 7e-9, window=window)
+    assert np.allclose(gated, first, atol=5e-2)
+
+
+def test_errors():
+    with pytest.raises(ValueError):
+        get_window(10, 'gauss')
+    with pytest.raises(ValueError):
+        transform(np.array([1e9, 2e9, 4e9]), np.ones(3))
+    with pytest.raises(ValueError):
+        transform(np.array([1e9]), np.ones(1))
@@ -0,0 +1,113 @@
+import io
+
+import numpy as np
+import pytest
+
+from Dataclasses.s2p import S2P
+from Dataclasses.touchstone import read_touchstone, records_to_complex
+from Exceptions.TouchstoneException import TouchstoneError
+
+_DATA = """! two points
+# GHz S MA R 50
+1.0 0.5 10 0.9 -20 0.01 30 0.4 40
+2.0 0.6 15 0.8 -25 0.02 35 0.3 45
+"""
+
+_NOISE = ''.join('{} 1.5 0.3 20 0.4\n'.format(f) for f in np.arange(1, 10) / 10)
+
+
+def _write(tmp_path, text, name='net.s2p'):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_read_touchstone_1(tmp_path):
+    freqs, matrix, options = read_touchstone(_write(tmp_path, _DATA))
+    assert np.allclose(freqs, [1e9, 2e9])
+    assert options['format'] == 'MA'
+    assert options['suffix'] == 'GHz'
+    # S21 is the second pair of a Touchstone record
+    assert np.isclose(matrix[0, 1, 0], 0.9 * np.exp(-1j * np.radians(20)))
+    assert np.isclose(matrix[0, 0, 1], 0.01 * np.exp(1j * np.radians(30)))
+
+
+def test_read_touchstone_2_keywords(tmp_path):
+    text = ('[Version] 2.0\n# GHz S RI R 50\n[Number of Ports] 2\n[Two-Port Data Order] 12_21\n'
+            '[Number of Frequencies] 1\n[Reference] 75 75\n[Network Data]\n'
+            '1.0 0.1 0 0.2 0 0.3 0 0.4 0\n[End]\n')
+    freqs, matrix, options = read_touchstone(_write(tmp_path, text))
+    assert options['z0'] == 75.
+    assert np.allclose(matrix[0].real, [[0.1, 0.2], [0.3, 0.4]])
+
+
+@pytest.mark.parametrize('fmt', ['DB', 'MA', 'RI'])
+@pytest.mark.parametrize('chunk_lines', [3, 65536])
+def test_round_trip(tmp_path, make_s2p, fmt, chunk_lines):
+    s2p = make_s2p(nop=50)
+    path = str(tmp_path / 'out.s2p')
+    s2p.to_s2p(path, format=fmt)
+    other = S2P()
+    other.from_s2p(path, chunk_lines=chunk_lines)
+    assert other.format == fmt
+    assert np.allclose(other._freq, s2p._freq)
+    assert np.allclose(other._matrix, s2p._matrix, atol=1e-8)
+
+
+def test_write_to_stream_in_other_units(make_s2p):
+    s2p = make_s2p(nop=3)
+    fh = io.StringIO()
+    s2p.to_s2p(fh, format='RI', freq_suffix='MHz')
+    lines = fh.getvalue().splitlines()
+    assert lines[0] == '# MHz S RI R 50'
+    assert float(lines[1].split()[0]) == pytest.approx(1000.)
+    assert s2p.freq.suffix == 'Hz'
+
+
+@pytest.mark.parametrize('rows', [1, 9])
+@pytest.mark.parametrize('chunk_lines', [1, 65536])
+def test_noise_parameters_are_skipped(tmp_path, rows, chunk_lines):
+    noise = ''.join(_NOISE.splitlines(True)[:rows])
+    freqs, matrix, options = read_touchstone(_write(tmp_path, _DATA + noise), chunk_lines=chunk_lines)
+    assert np.allclose(freqs, [1e9, 2e9])
+    assert matrix.shape == (2, 2, 2)
+
+
+def test_noise_data_2_is_skipped(tmp_path):
+    text = ('[Version] 2.0\n# GHz S RI R 50\n[Number of Ports] 2\n[Two-Port Data Order] 12_21\n'
+            '[Number of Frequencies] 2\n[Number of Noise Frequencies] 1\n[Reference]\n50\n50\n'
+            '[Network Data]\n1.0 0.1 0 0.2 0 0.3 0 0.4 0\n2.0 0.1 0 0.2 0 0.3 0 0.4 0\n'
+            '[Noise Data]\n1.0 1.5 0.3 20 0.4\n[End]\n')
+    freqs, matrix, options = read_touchstone(_write(tmp_path, text))
+    assert np.allclose(freqs, [1e9, 2e9])
+    assert options['z0'] == 50.
+
+
+def test_errors(tmp_path):
+    with pytest.raises(TouchstoneError):
+        read_touchstone(_write(tmp_path, '# GHz Z MA R 50\n1 2 3 4 5 6 7 8 9\n'))
+    with pytest.raises(TouchstoneError):
+        read_touchstone(_write(tmp_path, _DATA + '3.0 1 2 3\n'))
+    with pytest.raises(ValueError, match='port references'):
+        read_touchstone(_write(tmp_path, '[Version] 2.0\n# GHz S MA R 50\n[Reference] 50 75\n'
+                                         '[Network Data]\n1 1 0 1 0 1 0 1 0\n'))
+    with pytest.raises(ValueError, match='port references'):
+        read_touchstone(_write(tmp_path, '[Version] 2.0\n# GHz S MA R 50\n[Reference] 50\n75\n'
+                                         '[Network Data]\n1 1 0 1 0 1 0 1 0\n'))
+
+
+def test_from_s2p_keeps_degree(tmp_path):
+    s2p = S2P(degree=False)
+    s2p.from_s2p(_write(tmp_path, _DATA))
+    assert s2p.degree is False
+    assert np.isclose(s2p._matrix[0, 0, 0], 0.5 * np.exp(1j * np.radians(10)))
+
+
+def test_records_to_complex_orders():
+    block = np.array([[1., 0., 2., 0., 3., 0., 4., 0.]])
+    assert np.allclose(records_to_complex(block, 'RI', order='21_12')[0], [[1, 3], [2, 4]])
+    assert np.allclose(records_to_complex(block, 'RI', order='12_21')[0], [[1, 2], [3, 4]])
+    assert np.allclose(records_to_complex(block * 0 + 20, 'DB', degree=False)[0].real,
+                       10 * np.cos(20))
+    with pytest.raises(ValueError):
+        records_to_complex(block, 'XX')
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from Dataclasses.validation import causality, check, max_singular, passivity, reciprocity
+
+
+def _line(nop=201, delay=1e-9, loss=0.5):
+    freqs = np.linspace(1e9, 3e9, nop)
+    matrix = np.zeros((nop, 2, 2), dtype=complex)
+    matrix[:, 0, 1] = matrix[:, 1, 0] = loss * np.exp(-2j * np.pi * freqs * delay)
+    return freqs, matrix
+
+
+def test_max_singular_matches_svd():
+    rng = np.random.default_rng(0)
+    matrix = rng.standard_normal((3, 10, 2, 2)) + 1j * rng.standard_normal((3, 10, 2, 2))
+    expected = np.linalg.svd(matrix, compute_uv=False)[..., 0]
+    assert np.allclose(max_singular(matrix), expected)
+    big = matrix[..., :1, :1].repeat(3, axis=-1).repeat(3, axis=-2)
+    assert np.allclose(max_singular(big), np.linalg.svd(big, compute_uv=False)[..., 0])
+
+
+def test_passive_reciprocal_line():
+    freqs, matrix = _line()
+    assert np.allclose(passivity(matrix), 0.5)
+    assert np.allclose(reciprocity(matrix), 0)
+    result = check(matrix, freqs, causality_tol=1e-2)
+    assert not result['non_passive'].any()
+    assert not result['non_reciprocal'].any()
+    assert result['passivity_margin'] == pytest.approx(0.5)
+    assert not result['non_causal']
+
+
+def test_violations():
+    freqs, matrix = _line()
+    matrix[100:, 1, 0] *= 4
+    result = check(np.stack((matrix, _line()[1])), freqs)
+    assert result['non_passive'].shape == (2, len(freqs))
+    assert result['non_passive'][0, 100:].all()
+    assert not result['non_passive'][0, :100].any()
+    assert not result['non_passive'][1].any()
+    assert result['passivity_margin'][0] == pytest.approx(-1.)
+    assert result['non_reciprocal'][0, 100:].all()
+    assert result['reciprocity_error'][0] == pytest.approx(1.5)
+
+
+def test_causality_of_advance():
+    freqs, delayed = _line(delay=1e-9)
+    # time step is 0.5 ns, advance must be outside of 4 guard steps
+    _, advanced = _line(delay=-5e-9)
+    assert np.max(causality(freqs, delayed)[..., 1, 0]) < 1e-2
+    assert np.max(causality(freqs, advanced)[..., 1, 0]) > 0.5
+    with pytest.raises(ValueError):
+        check(advanced, causality_tol=1e-2)
+
+
+def test_object_checks_and_lot_report(tmp_path, make_s2p):
+    pytest.importorskip('pandas')
+    from Dataclasses.dataset import S2PDataset
+    from Dataclasses.sweep.x2p import XNP
+    freqs, line = _line(nop=21)
+    active = line.copy()
+    active[10:, 1, 0] *= 4
+    s2ps = [make_s2p(matrix=matrix, freqs=freqs) for matrix in (line, active)]
+    assert not s2ps[0].check()['non_passive'].any()
+    assert s2ps[1].check()['non_passive'][10:].all()
+    dataset = S2PDataset.from_s2ps(s2ps)
+    assert np.array_equal(dataset.check()['non_passive'][1], s2ps[1].check()['non_passive'])
+    xnp = XNP()
+    xnp.from_array(active)
+    assert np.array_equal(xnp.check()['non_reciprocal'], s2ps[1].check()['non_reciprocal'])
+    for i, s2p in enumerate(s2ps):
+        s2p.to_s2p(str(tmp_path / 'f{}.s2p'.format(i)), format='RI')
+    report = S2PDataset.check_files(str(tmp_path), processes=1)
+    assert list(report['passive']) == [True, False]
+    assert list(report['non_passive_points']) == [0, 11]
+    assert report['passivity_margin'][1] == pytest.approx(-1.)
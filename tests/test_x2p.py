@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from Dataclasses.sweep.x2p import XNP
+
+
+def _matrix(n_ports, nop=4, seed=0):
+    rng = np.random.default_rng(seed)
+    return 0.3 * (rng.standard_normal((nop, n_ports, n_ports))
+                  + 1j * rng.standard_normal((nop, n_ports, n_ports)))
+
+
+def test_from_array_resizes_common_z():
+    xnp = XNP()
+    xnp.from_array(_matrix(2))
+    assert xnp.port_number == 2
+    assert list(xnp.z) == [50, 50]
+    xnp.from_array(_matrix(3))
+    assert len(xnp.z) == 3
+
+
+def test_from_array_validates_per_port_z():
+    xnp = XNP()
+    xnp.from_array(_matrix(2), z=[50., 75.])
+    assert list(xnp.z) == [50., 75.]
+    with pytest.raises(ValueError):
+        xnp.from_array(_matrix(3))
+    with pytest.raises(ValueError):
+        xnp.from_array(_matrix(3), z=[50., 75.])
+    # failed calls don't change the object
+    assert xnp.port_number == 2
+    assert list(xnp.z) == [50., 75.]
+    xnp.from_array(_matrix(3), z=[50., 75., 100.])
+    assert xnp.port_number == 3
+    assert xnp.to('Z').shape == (4, 3, 3)